@@ -0,0 +1,204 @@
+# Атлас спрайтов: используемые картами тайлы (и при желании целые папки
+# набора Kenney) упакованы в несколько страниц PNG с манифестом в JSON.
+# Спрайт ищется по хэшу пикселей - тому же, что arcade считает для текстуры,
+# поэтому тайл из бандла карты находит себя в атласе без путей к файлам.
+# Страницы открываются лениво, при первом спрайте с этой страницы,
+# а атлас один на процесс и переживает матчи.
+# Собрать: python -m atlas [карты.tmx] [--dir папка] из каталога game.
+import argparse
+import glob
+import json
+import os
+import time
+
+import arcade
+from arcade.texture import ImageData
+from PIL import Image
+
+from mapcache import TILEMAP_DIR, load_map
+
+ATLAS_DIR = "cache/atlas"
+MANIFEST = "atlas.json"
+ATLAS_VERSION = 1
+PAGE_SIZE = 2048
+# пустые пиксели между спрайтами, чтобы UV соседей не смешивались
+PADDING = 1
+
+_shared = None
+
+
+class Atlas:
+    def __init__(self, directory=ATLAS_DIR):
+        self.directory = directory
+        path = os.path.join(directory, MANIFEST)
+        self.mtime = os.path.getmtime(path)
+        with open(path, encoding="utf-8") as file:
+            meta = json.load(file)
+        if meta["version"] != ATLAS_VERSION:
+            raise ValueError(f"Атлас версии {meta['version']}, нужна {ATLAS_VERSION}")
+        self.page_files = [page["file"] for page in meta["pages"]]
+        self.pages = [None] * len(self.page_files)
+        # хэш: (страница, x, y, ширина, высота)
+        self.sprites = {
+            sprite["hash"]: (sprite["page"], *sprite["rect"]) for sprite in meta["sprites"]
+        }
+        self.names = {sprite["name"]: sprite["hash"] for sprite in meta["sprites"] if sprite["name"]}
+        self.textures = {}
+        self.page_loads = 0
+
+    def __contains__(self, image_hash):
+        return image_hash in self.sprites
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def page(self, index):
+        if self.pages[index] is None:
+            image = Image.open(os.path.join(self.directory, self.page_files[index])).convert("RGBA")
+            image.load()
+            self.pages[index] = image
+            self.page_loads += 1
+        return self.pages[index]
+
+    def texture(self, image_hash):
+        texture = self.textures.get(image_hash)
+        if texture is None:
+            index, x, y, width, height = self.sprites[image_hash]
+            image = self.page(index).crop((x, y, x + width, y + height))
+            texture = self.textures[image_hash] = arcade.Texture(image, hash=image_hash)
+        return texture
+
+    def named(self, name):
+        return self.texture(self.names[name])
+
+
+def shared():
+    # атлас процесса; перечитывается, только если манифест пересобрали.
+    # None - атласа нет, текстуры тогда берутся из бандлов карт
+    global _shared
+    try:
+        mtime = os.path.getmtime(os.path.join(ATLAS_DIR, MANIFEST))
+    except OSError:
+        return None
+    if _shared is None or _shared.mtime != mtime:
+        try:
+            _shared = Atlas(ATLAS_DIR)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Атлас не загружен: {e}")
+            _shared = None
+    return _shared
+
+
+def map_sprites(paths):
+    # различные тайлы карт: хэш -> (имя, RGBA); отражения не нужны,
+    # они применяются к текстуре уже после атласа
+    sprites = {}
+    for path in paths:
+        try:
+            bundle = load_map(path)
+        except Exception as e:
+            print(f"{path}: ошибка разбора, карта пропущена: {e}")
+            continue
+        for (image_hash, _), image in zip(bundle.textures, bundle.images):
+            sprites.setdefault(image_hash, (None, Image.fromarray(image)))
+    return sprites
+
+
+def dir_sprites(directory):
+    # все PNG папки, имя спрайта - путь относительно каталога карт,
+    # как на него ссылаются тайлсеты
+    sprites = {}
+    for path in sorted(glob.glob(os.path.join(directory, "**", "*.png"), recursive=True)):
+        image = Image.open(path).convert("RGBA")
+        name = os.path.relpath(path, TILEMAP_DIR).replace(os.sep, "/")
+        sprites.setdefault(ImageData.calculate_hash(image), (name, image))
+    return sprites
+
+
+def pack(sizes, page_size=PAGE_SIZE, padding=PADDING):
+    # укладка полками: спрайты по убыванию высоты слева направо,
+    # новая полка - когда ряд кончился, новая страница - когда кончилась высота.
+    # Возвращает [(страница, x, y)] в порядке sizes и число страниц
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    places = [None] * len(sizes)
+    page = x = y = shelf = 0
+    for i in order:
+        width, height = sizes[i]
+        if width + 2 * padding > page_size or height + 2 * padding > page_size:
+            raise ValueError(f"Спрайт {width}x{height} больше страницы {page_size}")
+        if x + width + 2 * padding > page_size:
+            x, y, shelf = 0, y + shelf, 0
+        if y + height + 2 * padding > page_size:
+            page, x, y, shelf = page + 1, 0, 0, 0
+        places[i] = (page, x + padding, y + padding)
+        x += width + padding
+        shelf = max(shelf, height + padding)
+    return places, (page + 1 if sizes else 0)
+
+
+def build(sprites, directory=ATLAS_DIR):
+    hashes = list(sprites)
+    sizes = [sprites[image_hash][1].size for image_hash in hashes]
+    places, page_count = pack(sizes)
+
+    # страница обрезается по занятой области, UV считаются от её размера
+    extents = [[0, 0] for _ in range(page_count)]
+    for (page, x, y), (width, height) in zip(places, sizes):
+        extents[page][0] = max(extents[page][0], x + width + PADDING)
+        extents[page][1] = max(extents[page][1], y + height + PADDING)
+    pages = [Image.new("RGBA", tuple(extent), (0, 0, 0, 0)) for extent in extents]
+
+    os.makedirs(directory, exist_ok=True)
+    manifest = {"version": ATLAS_VERSION, "pages": [], "sprites": []}
+    for image_hash, (page, x, y), (width, height) in zip(hashes, places, sizes):
+        name, image = sprites[image_hash]
+        pages[page].paste(image, (x, y))
+        page_width, page_height = extents[page]
+        manifest["sprites"].append({
+            "hash": image_hash,
+            "name": name,
+            "page": page,
+            "rect": [x, y, width, height],
+            # u0, v0, u1, v1 от левого верхнего угла страницы
+            "uv": [
+                x / page_width, y / page_height,
+                (x + width) / page_width, (y + height) / page_height,
+            ],
+        })
+    for index, image in enumerate(pages):
+        file_name = f"page_{index}.png"
+        image.save(os.path.join(directory, file_name))
+        manifest["pages"].append({"file": file_name, "width": image.width, "height": image.height})
+    for old in glob.glob(os.path.join(directory, "page_*.png")):
+        if os.path.basename(old) not in {page["file"] for page in manifest["pages"]}:
+            os.remove(old)
+
+    # манифест пишется последним и подменяется целиком
+    temp = os.path.join(directory, MANIFEST + ".tmp")
+    with open(temp, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False)
+    os.replace(temp, os.path.join(directory, MANIFEST))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("maps", nargs="*", help="файлы TMX, по умолчанию все из " + TILEMAP_DIR)
+    parser.add_argument("--dir", action="append", default=[], help="папка с PNG, упаковать целиком")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sprites = map_sprites(args.maps or sorted(glob.glob(os.path.join(TILEMAP_DIR, "*.tmx"))))
+    for directory in args.dir:
+        for image_hash, sprite in dir_sprites(directory).items():
+            sprites.setdefault(image_hash, sprite)
+    manifest = build(sprites)
+    sizes = ", ".join(f"{page['width']}x{page['height']}" for page in manifest["pages"])
+    print(
+        f"Атлас: спрайтов {len(manifest['sprites'])}, страниц {len(manifest['pages'])} "
+        f"({sizes}), {time.perf_counter() - start:.3f} с"
+    )
+
+
+if __name__ == "__main__":
+    main()
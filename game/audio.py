@@ -0,0 +1,78 @@
+# Звуки: клип декодируется в PCM один раз на процесс и дальше берётся из кэша,
+# а играется через пул голосов - несколько плееров pyglet на звук, тоже
+# общих для всех матчей. Новый запуск занимает свободный голос или
+# перезапускает самый давний, слишком частые запуски пропускаются,
+# так что зажатый курок не плодит плееры, сколько бы ни длилась очередь.
+import math
+import time
+
+import arcade
+from pyglet import media
+
+VOICES = 4
+# запуск раньше этого интервала после предыдущего пропускается
+MIN_INTERVAL = 0.05
+
+_sounds = {}
+_pools = {}
+
+
+def load(path):
+    sound = _sounds.get(path)
+    if sound is None:
+        # streaming=False: клип целиком декодируется в память при загрузке
+        sound = _sounds[path] = arcade.load_sound(path, streaming=False)
+    return sound
+
+
+def pool(path, voices=VOICES, min_interval=MIN_INTERVAL):
+    voice_pool = _pools.get(path)
+    if voice_pool is None:
+        voice_pool = _pools[path] = VoicePool(load(path), voices, min_interval)
+    return voice_pool
+
+
+class VoicePool:
+    def __init__(self, sound, voices=VOICES, min_interval=MIN_INTERVAL):
+        self.sound = sound
+        self.voices = voices
+        self.min_interval = min_interval
+        # плееры создаются при первой нужде, но не больше voices
+        self.players = []
+        self.started = []
+        self.last = -math.inf
+        self.plays = 0
+        self.steals = 0
+        self.skipped = 0
+
+    def voice(self, now):
+        for i, player in enumerate(self.players):
+            if not player.playing:
+                return i
+        if len(self.players) < self.voices:
+            self.players.append(media.Player())
+            self.started.append(now)
+            return len(self.players) - 1
+        self.steals += 1
+        return min(range(len(self.players)), key=self.started.__getitem__)
+
+    def play(self, volume=1.0, pan=0.0):
+        now = time.perf_counter()
+        if now - self.last < self.min_interval:
+            self.skipped += 1
+            return None
+        self.last = now
+
+        i = self.voice(now)
+        player = self.players[i]
+        player.volume = volume
+        # панорама через положение в 3D, как в arcade.Sound.play
+        player.position = (pan, 0.0, math.sqrt(1 - pan * pan))
+        # доигравший плеер сам снимает клип с очереди
+        if player.source is None:
+            player.queue(self.sound.source)
+        player.seek(0.0)
+        player.play()
+        self.started[i] = now
+        self.plays += 1
+        return player
@@ -0,0 +1,150 @@
+# Замер check_collisions при росте числа врагов.
+# Запуск из каталога game: python -m bench.collisions
+import argparse
+import copy
+import math
+import random
+import time
+
+from types import SimpleNamespace
+
+from data import Bullet, Enemy, PlayerSkin, Weapon
+from simulation import ARENA_HEIGHT, ARENA_WIDTH, BULLET_SPEED, MapData, Simulation
+
+ENEMY_COUNTS = [50, 500, 1000, 2000, 5000]
+BULLET_COUNT = 200
+
+
+def make_sim(enemies, bullets):
+    # симуляция без стен, в её хранилища кладутся заготовленные объекты
+    sim = Simulation(
+        PlayerSkin(name="Солдат", max_health=10**9, speed=3.0),
+        Weapon(name="Автомат", damage=15, fire_rate=0.2),
+        MapData(),
+    )
+    for e in enemies:
+        sim.enemies.add(x=e.x, y=e.y, health=e.health, max_health=e.max_health,
+                        speed=e.speed, radius=e.radius)
+    for b in bullets:
+        sim.bullets.add(x=b.x, y=b.y, dx=b.dx, dy=b.dy, damage=b.damage, radius=b.radius)
+    return sim
+
+
+def brute_force(view):
+    # прежний перебор всех пар, эталон для сверки результатов
+    bullets_to_remove = set()
+    enemies_to_remove = set()
+    for i, bullet in enumerate(view.bullets):
+        for j, enemy in enumerate(view.enemies):
+            distance = math.sqrt((bullet.x - enemy.x)**2 + (bullet.y - enemy.y)**2)
+            if distance < bullet.radius + enemy.radius:
+                enemy.health -= view.weapon.damage
+                bullets_to_remove.add(i)
+                if enemy.health <= 0 and j not in enemies_to_remove:
+                    enemies_to_remove.add(j)
+                    view.score += 10
+                    view.total_kills += 1
+                break
+    for j, enemy in enumerate(view.enemies):
+        if j in enemies_to_remove:
+            continue
+        distance = math.sqrt((view.player_x - enemy.x)**2 + (view.player_y - enemy.y)**2)
+        if distance < view.player_radius + enemy.radius:
+            view.player_health -= 5
+            dist = max(0.1, distance)
+            enemy.x += ((enemy.x - view.player_x) / dist) * 20
+            enemy.y += ((enemy.y - view.player_y) / dist) * 20
+    view.enemies = [e for j, e in enumerate(view.enemies) if j not in enemies_to_remove]
+    view.bullets = [b for i, b in enumerate(view.bullets) if i not in bullets_to_remove]
+
+
+def make_world(rng, enemy_count, bullet_count):
+    enemies = []
+    for _ in range(enemy_count):
+        health = rng.randint(10, 40)
+        enemies.append(Enemy(
+            x=rng.uniform(0, ARENA_WIDTH),
+            y=rng.uniform(0, ARENA_HEIGHT),
+            health=health,
+            max_health=health,
+            speed=2,
+            radius=20 + rng.randint(-5, 5),
+        ))
+    bullets = []
+    for _ in range(bullet_count):
+        angle = rng.uniform(0, 2 * math.pi)
+        bullets.append(Bullet(
+            x=rng.uniform(0, ARENA_WIDTH),
+            y=rng.uniform(0, ARENA_HEIGHT),
+            dx=math.cos(angle) * BULLET_SPEED,
+            dy=math.sin(angle) * BULLET_SPEED,
+            damage=15,
+        ))
+    return enemies, bullets
+
+
+def snapshot(view):
+    # после flush() порядок в хранилищах меняется, поэтому сравниваются множества
+    return (
+        sorted((e.x, e.y, e.health) for e in view.enemies),
+        sorted((b.x, b.y) for b in view.bullets),
+        view.score, view.total_kills, view.player_health,
+    )
+
+
+def make_reference(enemies, bullets):
+    return SimpleNamespace(
+        enemies=enemies,
+        bullets=bullets,
+        weapon=Weapon(name="Автомат", damage=15, fire_rate=0.2),
+        player_x=ARENA_WIDTH // 2,
+        player_y=ARENA_HEIGHT // 2,
+        player_radius=25,
+        player_health=10**9,
+        score=0,
+        total_kills=0,
+    )
+
+
+def measure(enemies, bullets, frames, step, make):
+    total = 0.0
+    for _ in range(frames):
+        view = make(copy.deepcopy(enemies), list(bullets))
+        start = time.perf_counter()
+        step(view)
+        total += time.perf_counter() - start
+    return total / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--bullets", type=int, default=BULLET_COUNT)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--brute", action="store_true", help="замерить и полный перебор")
+    args = parser.parse_args()
+
+    print(f"{'врагов':>8} {'сетка, мс':>10} {'перебор, мс':>12}")
+    for enemy_count in ENEMY_COUNTS:
+        rng = random.Random(args.seed)
+        enemies, bullets = make_world(rng, enemy_count, args.bullets)
+
+        grid_sim = make_sim(enemies, bullets)
+        grid_sim.check_collisions()
+        grid_sim.enemies.flush()
+        grid_sim.bullets.flush()
+        brute_view = make_reference(copy.deepcopy(enemies), list(bullets))
+        brute_force(brute_view)
+        if snapshot(grid_sim) != snapshot(brute_view):
+            raise SystemExit(f"Результаты сетки и перебора расходятся при {enemy_count} врагах")
+
+        grid_ms = measure(enemies, bullets, args.frames, Simulation.check_collisions, make_sim)
+        brute_ms = (
+            measure(enemies, bullets, args.frames, brute_force, make_reference)
+            if args.brute else float("nan")
+        )
+        print(f"{enemy_count:>8} {grid_ms:>10.3f} {brute_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
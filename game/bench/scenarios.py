@@ -0,0 +1,240 @@
+# Сценарии нагрузки для симуляции без окна.
+# Запуск из каталога game:
+#   python -m bench.scenarios                      все сценарии
+#   python -m bench.scenarios --only enemies_5000  один сценарий
+#   python -m bench.scenarios --json results.json --baseline baseline.json
+# Для каждого сценария: тиков в секунду, время по фазам тика (p50/p95, среднее),
+# сколько раз росли пулы сущностей и прирост числа блоков памяти Python.
+import argparse
+import json
+import math
+import random
+import sys
+import time
+
+import numpy as np
+
+from data import PlayerSkin, Weapon
+from profiler import SIM_PHASES, FrameProfiler
+from simulation import ARENA_HEIGHT, ARENA_WIDTH, InputState, MapData, Simulation, default_map
+from telemetry import machine_info
+
+# допустимое падение тиков в секунду относительно базы
+TOLERANCE = 0.10
+# бюджет тика при 60 кадрах в секунду и сценарии, которые обязаны в него
+# укладываться по p95: цель - 10 тысяч живых врагов при 60 кадрах
+TICK_BUDGET_MS = 1000 / 60
+BUDGETED = ("enemies_10000_spread",)
+
+
+def immortal_skin():
+    return PlayerSkin(name="Солдат", max_health=10**9, speed=3.0)
+
+
+def pistol():
+    return Weapon(name="Пистолет", damage=10, fire_rate=0.5)
+
+
+def populate(sim, rng, count):
+    # враги равномерно по арене внутри внешнего ряда стен
+    for _ in range(count):
+        health = rng.randint(30, 60)
+        sim.enemies.add(
+            x=rng.uniform(80, sim.width - 80),
+            y=rng.uniform(80, sim.height - 80),
+            health=health,
+            max_health=health,
+            speed=2 + rng.uniform(-0.5, 0.5),
+            radius=20 + rng.randint(-5, 5),
+        )
+
+
+def dense_map(rng, fill=0.3, tile_size=64):
+    # арена default_map плюс случайные стены на доле fill тайлов
+    game_map = default_map(rng, ARENA_WIDTH, ARENA_HEIGHT, tile_size)
+    half = tile_size / 2
+    centre = (ARENA_WIDTH // tile_size // 2, ARENA_HEIGHT // tile_size // 2)
+    for col in range(2, ARENA_WIDTH // tile_size - 2):
+        for row in range(2, ARENA_HEIGHT // tile_size - 2):
+            if abs(col - centre[0]) + abs(row - centre[1]) > 2 and rng.random() < fill:
+                game_map.walls.append((col * tile_size + half, row * tile_size + half, half, half))
+    return game_map
+
+
+def idle(sim, tick):
+    return InputState()
+
+
+def strafe(sim, tick):
+    # игрок ходит по квадрату и стреляет по кругу
+    side = (tick // 90) % 4
+    angle = tick * 0.05
+    return InputState(
+        up=side == 0, right=side == 1, down=side == 2, left=side == 3,
+        aim_x=sim.player_x + math.cos(angle) * 300,
+        aim_y=sim.player_y + math.sin(angle) * 300,
+        fire=True,
+    )
+
+
+def make_empty(rng):
+    return Simulation(immortal_skin(), pistol(), MapData(), rng=rng)
+
+
+def make_crowd(count):
+    def make(rng):
+        # без точек спавна: число врагов держится на count минус убитые
+        game_map = default_map(rng)
+        game_map.spawn_points = []
+        sim = Simulation(immortal_skin(), pistol(), game_map, rng=rng)
+        populate(sim, rng, count)
+        return sim
+    return make
+
+
+def make_spread(count, width, height):
+    def make(rng):
+        # большая арена, враги раскиданы по ней равномерно, а не стоят толпой
+        game_map = default_map(rng, width, height)
+        game_map.spawn_points = []
+        sim = Simulation(immortal_skin(), pistol(), game_map, rng=rng, width=width, height=height)
+        populate(sim, rng, count)
+        return sim
+    return make
+
+
+def make_bullet_storm(rng):
+    # автомат без задержки: выстрел каждый тик
+    game_map = default_map(rng)
+    game_map.spawn_points = []
+    sim = Simulation(immortal_skin(), Weapon(name="Автомат", damage=15, fire_rate=0), game_map, rng=rng)
+    populate(sim, rng, 300)
+    return sim
+
+
+def make_dense_walls(rng):
+    game_map = dense_map(rng)
+    game_map.spawn_points = []
+    sim = Simulation(immortal_skin(), pistol(), game_map, rng=rng)
+    populate(sim, rng, 1000)
+    return sim
+
+
+def make_spawn_ramp(rng):
+    # обычный матч с обычным спавном, только игрок бессмертен
+    return Simulation(immortal_skin(), pistol(), default_map(rng), rng=rng)
+
+
+# имя: (сборка симуляции, ввод по тику, тиков)
+SCENARIOS = {
+    "idle": (make_empty, idle, 3000),
+    "enemies_500": (make_crowd(500), strafe, 600),
+    "enemies_5000": (make_crowd(5000), strafe, 200),
+    "enemies_20000": (make_crowd(20000), strafe, 60),
+    "enemies_10000_spread": (make_spread(10000, 4000, 3000), strafe, 300),
+    "bullet_storm": (make_bullet_storm, strafe, 1200),
+    "dense_walls": (make_dense_walls, strafe, 600),
+    "spawn_ramp": (make_spawn_ramp, strafe, 18000),
+}
+
+
+def run(name, seed=1, ticks=None):
+    make, drive, default_ticks = SCENARIOS[name]
+    ticks = ticks or default_ticks
+    sim = make(random.Random(seed))
+    profiler = FrameProfiler(SIM_PHASES, capacity=ticks)
+    profiler.enabled = True
+    sim.profiler = profiler
+
+    allocations = sim.enemies.allocations + sim.bullets.allocations
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    for tick in range(ticks):
+        sim.step(drive(sim, tick))
+        profiler.end_frame()
+    seconds = time.perf_counter() - start
+
+    rows = profiler.recent() * 1000
+    tick_ms = rows.sum(axis=1)
+    phases = {}
+    for i, phase in enumerate(profiler.phases):
+        column = rows[:, i]
+        phases[phase] = {
+            "mean_ms": round(float(column.mean()), 4),
+            "p50_ms": round(float(np.percentile(column, 50)), 4),
+            "p95_ms": round(float(np.percentile(column, 95)), 4),
+        }
+    return {
+        "ticks": ticks,
+        "seconds": round(seconds, 4),
+        "ticks_per_second": round(ticks / seconds, 1),
+        "tick_p50_ms": round(float(np.percentile(tick_ms, 50)), 3),
+        "tick_p95_ms": round(float(np.percentile(tick_ms, 95)), 3),
+        "phases": phases,
+        "pool_allocations": sim.enemies.allocations + sim.bullets.allocations - allocations,
+        "allocated_blocks": sys.getallocatedblocks() - blocks,
+        "enemies": len(sim.enemies),
+        "peak_enemies": sim.enemies.peak,
+        "peak_bullets": sim.bullets.peak,
+    }
+
+
+def compare(results, baseline, tolerance):
+    # список сценариев, где тиков в секунду стало меньше базы больше чем на tolerance
+    regressions = []
+    print(f"\n{'сценарий':<16} {'база':>10} {'сейчас':>10} {'изм.':>8}")
+    for name, result in results.items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        before, after = base["ticks_per_second"], result["ticks_per_second"]
+        change = after / before - 1
+        mark = ""
+        if change < -tolerance:
+            regressions.append(name)
+            mark = "  регрессия"
+        print(f"{name:<16} {before:>10.1f} {after:>10.1f} {change:>+8.1%}{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", action="append", choices=sorted(SCENARIOS), help="сценарий, можно несколько раз")
+    parser.add_argument("--ticks", type=int, help="тиков на сценарий вместо заданных по умолчанию")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="куда сохранить результаты")
+    parser.add_argument("--baseline", help="результаты прошлого запуска для сравнения")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.only or SCENARIOS:
+        result = results[name] = run(name, args.seed, args.ticks)
+        slowest = sorted(result["phases"].items(), key=lambda item: -item[1]["mean_ms"])[:3]
+        phases = ", ".join(f"{phase} {stats['mean_ms']:.3f}" for phase, stats in slowest)
+        print(
+            f"{name:<16} {result['ticks_per_second']:>10.1f} тиков/с"
+            f"  тик p50 {result['tick_p50_ms']:.1f} p95 {result['tick_p95_ms']:.1f} мс"
+            f"  пулы +{result['pool_allocations']}  блоки {result['allocated_blocks']:+d}"
+            f"  [{phases} мс]"
+        )
+
+    over = [name for name in results if name in BUDGETED and results[name]["tick_p95_ms"] > TICK_BUDGET_MS]
+    for name in over:
+        print(f"{name}: тик p95 {results[name]['tick_p95_ms']:.1f} мс больше бюджета {TICK_BUDGET_MS:.1f} мс")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"machine": machine_info(), "seed": args.seed, "scenarios": results},
+                      file, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            raise SystemExit(f"Регрессии: {', '.join(regressions)}")
+    if over:
+        raise SystemExit(f"Вне бюджета тика: {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
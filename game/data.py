@@ -1,5 +1,4 @@
 import math
-import arcade
 from dataclasses import dataclass
 from typing import List
 
@@ -79,14 +78,11 @@ class Bullet:
     dy: float
     damage: int
     radius: int = 5
-    color: arcade.color = arcade.color.YELLOW
+    color: tuple = (255, 255, 0, 255)  # arcade.color.YELLOW
     
     def update(self):
         self.x += self.dx
         self.y += self.dy
-    
-    def draw(self):
-        arcade.draw_circle_filled(self.x, self.y, self.radius, self.color)
 
 @dataclass
 class Enemy:
@@ -96,7 +92,7 @@ class Enemy:
     max_health: int
     speed: float
     radius: int = 20
-    color: arcade.color = arcade.color.RED
+    color: tuple = (255, 0, 0, 255)  # arcade.color.RED
     
     def update(self, player_x, player_y):
         dx = player_x - self.x
@@ -106,26 +102,3 @@ class Enemy:
         if dist > 0:
             self.x += (dx / dist) * self.speed
             self.y += (dy / dist) * self.speed
-    
-    def draw(self):
-        arcade.draw_circle_filled(self.x, self.y, self.radius, self.color)
-        arcade.draw_circle_outline(self.x, self.y, self.radius, arcade.color.BLACK, 2)
-
-        arcade.draw_circle_filled(self.x - 8, self.y + 5, 5, arcade.color.WHITE)
-        arcade.draw_circle_filled(self.x + 8, self.y + 5, 5, arcade.color.WHITE)
-        arcade.draw_circle_filled(self.x - 8, self.y + 5, 2, arcade.color.BLACK)
-        arcade.draw_circle_filled(self.x + 8, self.y + 5, 2, arcade.color.BLACK)
-
-        health_width = 40
-        health_ratio = self.health / self.max_health
-        arcade.draw_lbwh_rectangle_filled(
-            self.x, self.y + self.radius + 15,
-            health_width, 5,
-            arcade.color.DARK_GRAY
-        )
-        arcade.draw_lbwh_rectangle_filled(
-            self.x - (health_width/2) + (health_width * health_ratio / 2),
-            self.y + self.radius + 15,
-            health_width * health_ratio, 3,
-            arcade.color.GREEN
-        )
@@ -2,10 +2,28 @@ import sqlite3
 import json
 from typing import Optional, List, Dict
 
+from telemetry import bucket_columns
+
+# Колонки perf_sessions, которые заполняет SessionTelemetry.summary();
+# корзины времени кадра берутся из телеметрии, чтобы не расходиться с ней
+PERF_COLUMNS = ['tick_rate', 'frames', 'duration'] + bucket_columns() + [
+    'slow_frames', 'dropped_ticks', 'peak_enemies', 'peak_bullets',
+    'sim_ms', 'render_ms', 'sim_share', 'render_share',
+    'platform', 'python_version', 'cpu_count', 'gl_renderer', 'arcade_version'
+]
+# типы колонок perf_sessions для миграции старых баз; остальные - INTEGER DEFAULT 0
+PERF_TYPES = {
+    'duration': 'REAL DEFAULT 0', 'sim_ms': 'REAL DEFAULT 0', 'render_ms': 'REAL DEFAULT 0',
+    'sim_share': 'REAL DEFAULT 0', 'render_share': 'REAL DEFAULT 0',
+    'platform': 'TEXT', 'python_version': 'TEXT', 'gl_renderer': 'TEXT', 'arcade_version': 'TEXT',
+}
+
 
 class Database:
     def __init__(self, db_name="game_data.db"):
-        self.conn = sqlite3.connect(db_name)
+        # соединение используется и из потока загрузки матча (LoadingView),
+        # но никогда из двух потоков одновременно
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
         self.create_tables()
         self.cursor = self.conn.cursor()
     
@@ -46,6 +64,48 @@ class Database:
                 FOREIGN KEY (user_id) REFERENCES users (id)
             )
         ''')
+
+        # время кадра по корзинам: ft_lt_N - кадры короче N мс
+        buckets = ",\n".join(f"                {name} INTEGER DEFAULT 0" for name in bucket_columns())
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS perf_sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+                tick_rate INTEGER NOT NULL,
+                frames INTEGER NOT NULL,
+                duration REAL NOT NULL,
+
+{buckets},
+
+                slow_frames INTEGER DEFAULT 0,
+                dropped_ticks INTEGER DEFAULT 0,
+                peak_enemies INTEGER DEFAULT 0,
+                peak_bullets INTEGER DEFAULT 0,
+                sim_ms REAL DEFAULT 0,
+                render_ms REAL DEFAULT 0,
+                sim_share REAL DEFAULT 0,
+                render_share REAL DEFAULT 0,
+
+                platform TEXT,
+                python_version TEXT,
+                cpu_count INTEGER,
+                gl_renderer TEXT,
+                arcade_version TEXT,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+
+        # CREATE TABLE IF NOT EXISTS не трогает таблицу из старой базы:
+        # недостающие колонки (например, новые корзины) добавляются отдельно
+        cursor.execute("PRAGMA table_info(perf_sessions)")
+        existing = {row[1] for row in cursor.fetchall()}
+        for name in PERF_COLUMNS:
+            if name not in existing:
+                cursor.execute(
+                    f"ALTER TABLE perf_sessions ADD COLUMN {name} {PERF_TYPES.get(name, 'INTEGER DEFAULT 0')}"
+                )
         
         self.conn.commit()
     
@@ -108,6 +168,20 @@ class Database:
         
         self.conn.commit()
     
+    def record_perf_session(self, user_id: int, telemetry: Dict):
+        unknown = set(telemetry) - set(PERF_COLUMNS)
+        if unknown:
+            raise ValueError(f"Неизвестные колонки perf_sessions: {', '.join(sorted(unknown))}")
+        cursor = self.conn.cursor()
+        columns = [column for column in PERF_COLUMNS if column in telemetry]
+        cursor.execute(
+            f"INSERT INTO perf_sessions (user_id, {', '.join(columns)}) "
+            f"VALUES (?, {', '.join('?' * len(columns))})",
+            [user_id] + [telemetry[column] for column in columns]
+        )
+        self.conn.commit()
+        return cursor.lastrowid
+    
     def update_user_settings(self, user_id: int, **settings):
         cursor = self.conn.cursor()
         updates = []
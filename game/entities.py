@@ -0,0 +1,246 @@
+import numpy as np
+
+from data import Bullet, Enemy
+
+# Хранилища сущностей в виде структуры массивов: каждое поле лежит
+# в своём непрерывном массиве NumPy, а движение, наведение, отсев
+# и урон считаются одной операцией над всем массивом сразу.
+# Наружу объекты видны через тонкие представления с API Bullet/Enemy.
+#
+# Хранилище работает как пул слотов: живые сущности занимают первые
+# count слотов, ёмкость не уменьшается, а удаление отложенное - kill()
+# только помечает слот, и в конце тика flush() закрывает дыры последними
+# живыми сущностями (swap-remove), так что удаление стоит O(1) на сущность.
+
+
+def _field(name):
+    def get(self):
+        value = getattr(self.store, name)[self.index]
+        return tuple(value.tolist()) if value.ndim else value.item()
+
+    def set(self, value):
+        getattr(self.store, name)[self.index] = value
+
+    return property(get, set)
+
+
+class EntityView:
+    # Представление привязано к слоту, а не к сущности: после flush()
+    # в слоте может оказаться другая сущность
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+
+class BulletView(EntityView):
+    __slots__ = ()
+
+    x = _field("x")
+    y = _field("y")
+    dx = _field("dx")
+    dy = _field("dy")
+    damage = _field("damage")
+    radius = _field("radius")
+    color = _field("color")
+
+    update = Bullet.update
+
+
+class EnemyView(EntityView):
+    __slots__ = ()
+
+    x = _field("x")
+    y = _field("y")
+    health = _field("health")
+    max_health = _field("max_health")
+    speed = _field("speed")
+    radius = _field("radius")
+    color = _field("color")
+
+    update = Enemy.update
+
+
+class EntityStore:
+    # (имя, dtype, форма одного элемента)
+    FIELDS = ()
+    VIEW = EntityView
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.capacity = capacity
+        for name, dtype, shape in self.FIELDS:
+            setattr(self, name, np.zeros((capacity,) + shape, dtype=dtype))
+        self.dying = np.zeros(capacity, dtype=bool)
+        # представления создаются по одному на слот и переиспользуются
+        self.views = [self.VIEW(self, index) for index in range(capacity)]
+
+        self.peak = 0
+        self.hits = 0
+        self.misses = 0
+        self.allocations = 0
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self.views[index]
+
+    def __iter__(self):
+        return iter(self.views[:self.count])
+
+    @property
+    def alive(self):
+        return ~self.dying[:self.count]
+
+    def _grow(self, capacity):
+        for name, dtype, shape in self.FIELDS:
+            array = np.zeros((capacity,) + shape, dtype=dtype)
+            array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        dying = np.zeros(capacity, dtype=bool)
+        dying[:self.count] = self.dying[:self.count]
+        self.dying = dying
+        self.views.extend(self.VIEW(self, index) for index in range(self.capacity, capacity))
+        self.capacity = capacity
+        self.allocations += 1
+
+    def add(self, **values):
+        if self.count == self.capacity:
+            self.misses += 1
+            self._grow(self.capacity * 2)
+        else:
+            self.hits += 1
+        index = self.count
+        for name, dtype, shape in self.FIELDS:
+            getattr(self, name)[index] = values[name]
+        self.dying[index] = False
+        self.count += 1
+        self.peak = max(self.peak, self.count)
+        return self.views[index]
+
+    def kill(self, mask):
+        # отложенное удаление: mask - булев массив длины count или индексы
+        self.dying[:self.count][mask] = True
+
+    def flush(self):
+        # закрывает дыры от kill() последними живыми сущностями
+        n = self.count
+        dead = np.flatnonzero(self.dying[:n])
+        if not len(dead):
+            return
+        alive = n - len(dead)
+        holes = dead[dead < alive]
+        tail = np.flatnonzero(~self.dying[alive:n]) + alive
+        for name, dtype, shape in self.FIELDS:
+            array = getattr(self, name)
+            array[holes] = array[tail]
+        self.dying[:n] = False
+        self.count = alive
+
+    def remember_positions(self):
+        # положения на начало тика, между ними и текущими идёт интерполяция
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def interpolate(self, alpha):
+        n = self.count
+        prev_x, prev_y = self.prev_x[:n], self.prev_y[:n]
+        return (
+            prev_x + (self.x[:n] - prev_x) * alpha,
+            prev_y + (self.y[:n] - prev_y) * alpha,
+        )
+
+    def clear(self):
+        self.dying[:self.count] = False
+        self.count = 0
+
+    def stats(self):
+        requests = self.hits + self.misses
+        return {
+            "live": self.count,
+            "pool_size": self.capacity,
+            "peak": self.peak,
+            "hit_rate": self.hits / requests if requests else 1.0,
+            "allocations": self.allocations,
+        }
+
+
+class BulletStore(EntityStore):
+    FIELDS = (
+        ("x", np.float64, ()),
+        ("y", np.float64, ()),
+        ("prev_x", np.float64, ()),
+        ("prev_y", np.float64, ()),
+        ("dx", np.float64, ()),
+        ("dy", np.float64, ()),
+        ("damage", np.int32, ()),
+        ("radius", np.int32, ()),
+        ("color", np.uint8, (4,)),
+    )
+    VIEW = BulletView
+
+    def add(self, x, y, dx, dy, damage, radius=5, color=(255, 255, 0, 255)):
+        return super().add(
+            x=x, y=y, prev_x=x, prev_y=y, dx=dx, dy=dy,
+            damage=damage, radius=radius, color=color,
+        )
+
+    def update(self):
+        n = self.count
+        self.x[:n] += self.dx[:n]
+        self.y[:n] += self.dy[:n]
+
+    def out_of_bounds(self, left, bottom, right, top):
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        return (x < left) | (x > right) | (y < bottom) | (y > top)
+
+
+class EnemyStore(EntityStore):
+    FIELDS = (
+        ("x", np.float64, ()),
+        ("y", np.float64, ()),
+        ("prev_x", np.float64, ()),
+        ("prev_y", np.float64, ()),
+        ("health", np.int32, ()),
+        ("max_health", np.int32, ()),
+        ("speed", np.float64, ()),
+        ("radius", np.int32, ()),
+        ("color", np.uint8, (4,)),
+    )
+    VIEW = EnemyView
+
+    def add(self, x, y, health, max_health, speed, radius=20, color=(255, 0, 0, 255)):
+        return super().add(
+            x=x, y=y, prev_x=x, prev_y=y, health=health, max_health=max_health,
+            speed=speed, radius=radius, color=color,
+        )
+
+    def update(self, target_x, target_y, scale=1.0):
+        # то же, что Enemy.update, но для всех врагов сразу; цель - точка
+        # или массивы точек по врагу, scale - длина тика в кадрах по 1/60 с
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        dx = target_x - x
+        dy = target_y - y
+        dist = np.sqrt(dx*dx + dy*dy)
+        moving = dist > 0
+        dist[~moving] = 1.0
+        speed = np.where(moving, self.speed[:n] * scale, 0.0)
+        x += (dx / dist) * speed
+        y += (dy / dist) * speed
+
+    def damage(self, indices, amounts):
+        # урон по индексам с повторами; возвращает маску убитых этим уроном
+        n = self.count
+        before = self.health[:n] > 0
+        np.subtract.at(self.health, indices, amounts)
+        return before & (self.health[:n] <= 0)
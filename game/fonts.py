@@ -0,0 +1,241 @@
+# Прогрев шрифтов: pyglet растеризует глиф при первом появлении символа,
+# и для крупного кириллического шрифта это сотни миллисекунд прямо в кадре.
+# start() загружает все шрифты видов и восстанавливает глифы из кэша
+# на диске, warm() доращивает недостающие понемногу за кадр, пока меню
+# и экран загрузки простаивают, а когда всё готово - сохраняет кэш:
+# страницы с картинками глифов и манифест с их метриками в JSON.
+# При следующем запуске страница грузится в текстуру целиком, а глифы
+# становятся её областями без растеризации.
+import json
+import os
+import time
+from collections import deque
+
+import pyglet
+from pyglet.font.base import Font, GlyphTexture
+from pyglet.gl import GL_TEXTURE_2D
+from pyglet.image import ImageData
+from PIL import Image
+
+GLYPH_DIR = "cache/glyphs"
+MANIFEST = "glyphs.json"
+GLYPH_VERSION = 1
+# сколько секунд кадра можно отдать растеризации
+WARM_BUDGET = 0.004
+
+# dpi, с которым arcade.Text грузит шрифты
+TEXT_DPI = 96
+# шрифт arcade.draw_text по умолчанию
+DEFAULT_FONT = ("calibri", "arial")
+
+# (шрифт, размер, жирный) - все, что рисуют виды
+FONTS = (
+    # меню и экран загрузки
+    ("Arial", 48, True),
+    ("Arial", 32, True),
+    ("Arial", 20, True),
+    ("Arial", 18, False),
+    # бойцы, арсенал, профиль и конец матча
+    (DEFAULT_FONT, 14, False),
+    (DEFAULT_FONT, 16, False),
+    (DEFAULT_FONT, 18, False),
+    (DEFAULT_FONT, 18, True),
+    (DEFAULT_FONT, 20, False),
+    (DEFAULT_FONT, 20, True),
+    (DEFAULT_FONT, 22, True),
+    (DEFAULT_FONT, 24, False),
+    (DEFAULT_FONT, 24, True),
+    (DEFAULT_FONT, 28, True),
+    (DEFAULT_FONT, 32, False),
+    (DEFAULT_FONT, 32, True),
+    (DEFAULT_FONT, 36, True),
+    (DEFAULT_FONT, 48, True),
+    # HUD матча
+    ("arial", 18, False),
+    ("arial", 20, False),
+    ("arial", 22, True),
+    # оверлей F3
+    (("courier new", "dejavu sans mono", "monospace"), 11, False),
+)
+
+CHARSET = (
+    "".join(chr(code) for code in range(32, 127))
+    + "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ"
+    + "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+    + "№—…"
+    + "👤"
+)
+
+# ключ шрифта -> шрифт pyglet; ссылки держатся здесь,
+# иначе pyglet выгрузит шрифт вместе с глифами
+_fonts = {}
+# текстуры страниц кэша, создаются при первом глифе со страницы
+_pages = []
+_page_meta = []
+# (ключ шрифта, символ) - ещё не растеризованные
+_pending = deque()
+_rasterised = 0
+
+
+def load_font(name, size, bold):
+    # тот же шрифт, что получит arcade.Text: имя сначала сводится
+    # к семейству, найденному в системе, затем грузится нужный размер
+    family = pyglet.font.load((name,) if isinstance(name, str) else name).name
+    return pyglet.font.load(family, size, weight="bold" if bold else "normal", dpi=TEXT_DPI)
+
+
+def font_key(font):
+    # по семейству, а не по запрошенному имени: "Arial" и шрифт
+    # по умолчанию могут оказаться одним и тем же шрифтом системы
+    return f"{font.name}|{font.size}|{font.weight}|{int(bool(font.italic))}|{font.dpi}"
+
+
+def read_manifest(directory=GLYPH_DIR):
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest["version"] != GLYPH_VERSION or manifest["pyglet"] != pyglet.version:
+            print("Кэш глифов от другой версии, шрифты будут растеризованы заново")
+            return None
+        return manifest
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Кэш глифов не прочитан: {e}")
+        return None
+
+
+def page(index, directory=GLYPH_DIR):
+    if _pages[index] is None:
+        meta = _page_meta[index]
+        width, height = meta["width"], meta["height"]
+        with open(os.path.join(directory, meta["file"]), "rb") as file:
+            data = file.read()
+        if len(data) != width * height * 4:
+            raise ValueError(f"{meta['file']}: размер не совпадает с манифестом")
+        texture = GlyphTexture.create(
+            width, height, GL_TEXTURE_2D, Font.texture_internalformat,
+            Font.texture_min_filter, Font.texture_mag_filter,
+        )
+        # строки страницы идут снизу вверх, как в текстуре
+        texture.blit_into(ImageData(width, height, "RGBA", data), 0, 0, 0)
+        _pages[index] = texture
+    return _pages[index]
+
+
+def restore(font, glyphs):
+    for char, index, x, y, width, height, baseline, lsb, advance, flipped, colored in glyphs:
+        if char in font.glyphs:
+            continue
+        glyph = page(index).get_region(x, y, width, height)
+        glyph.set_bearings(baseline, lsb, advance)
+        if flipped:
+            # FreeType отдаёт картинку сверху вниз, pyglet переворачивает UV
+            t = list(glyph.tex_coords)
+            glyph.tex_coords = t[9:12] + t[6:9] + t[3:6] + t[:3]
+        glyph.colored = colored
+        font.glyphs[char] = glyph
+
+
+def start():
+    # вызывается при открытом окне, до первого кадра меню
+    manifest = read_manifest()
+    cached = {}
+    if manifest is not None:
+        _page_meta[:] = manifest["pages"]
+        _pages[:] = [None] * len(_page_meta)
+        cached = manifest["fonts"]
+
+    restored = 0
+    for name, size, bold in FONTS:
+        font = load_font(name, size, bold)
+        key = font_key(font)
+        if key in _fonts:
+            continue
+        _fonts[key] = font
+        if key in cached:
+            try:
+                restore(font, cached[key])
+                restored += len(cached[key])
+            except (OSError, ValueError) as e:
+                # испорченная страница: остальные шрифты растеризуются заново
+                print(f"Кэш глифов не загружен: {e}")
+                cached = {}
+        _pending.extend((key, char) for char in CHARSET if char not in font.glyphs)
+    if _pending:
+        print(f"Шрифтов {len(_fonts)}, глифов из кэша {restored}, к растеризации {len(_pending)}")
+
+
+def warm(budget=WARM_BUDGET):
+    global _rasterised
+    if not _pending:
+        return True
+    deadline = time.perf_counter() + budget
+    while _pending and time.perf_counter() < deadline:
+        key, char = _pending.popleft()
+        font = _fonts[key]
+        if char not in font.glyphs:
+            font.get_glyphs(char)
+            _rasterised += 1
+    if not _pending and _rasterised:
+        save()
+        _rasterised = 0
+    return not _pending
+
+
+def save(directory=GLYPH_DIR):
+    # тяжёлые импорты атласа нужны только здесь, а сохранение - раз на набор шрифтов
+    from atlas import PADDING, pack
+
+    start_time = time.perf_counter()
+    entries = []
+    owners = {}
+    for key, font in _fonts.items():
+        for char, glyph in font.glyphs.items():
+            # с HarfBuzz ключи - индексы глифов, такие не кэшируются
+            if not isinstance(char, str):
+                continue
+            owner = glyph.owner
+            if id(owner) not in owners:
+                data = owner.get_image_data()
+                owners[id(owner)] = Image.frombytes(
+                    "RGBA", (data.width, data.height), data.get_data("RGBA", data.width * 4)
+                )
+            image = owners[id(owner)].crop((glyph.x, glyph.y, glyph.x + glyph.width, glyph.y + glyph.height))
+            flipped = glyph.tex_coords[1] > glyph.tex_coords[7]
+            entries.append((key, char, glyph, flipped, image))
+
+    places, page_count = pack([image.size for *_, image in entries])
+    extents = [[0, 0] for _ in range(page_count)]
+    for (index, x, y), (*_, image) in zip(places, entries):
+        extents[index][0] = max(extents[index][0], x + image.width + PADDING)
+        extents[index][1] = max(extents[index][1], y + image.height + PADDING)
+    pages = [Image.new("RGBA", tuple(extent), (0, 0, 0, 0)) for extent in extents]
+
+    os.makedirs(directory, exist_ok=True)
+    manifest = {"version": GLYPH_VERSION, "pyglet": pyglet.version, "pages": [], "fonts": {}}
+    for (index, x, y), (key, char, glyph, flipped, image) in zip(places, entries):
+        pages[index].paste(image, (x, y))
+        manifest["fonts"].setdefault(key, []).append([
+            char, index, x, y, image.width, image.height,
+            glyph.baseline, glyph.lsb, glyph.advance, flipped, glyph.colored,
+        ])
+    for index, image in enumerate(pages):
+        # без сжатия: страница читается одним вызовом, без распаковки PNG
+        file_name = f"page_{index}.rgba"
+        with open(os.path.join(directory, file_name), "wb") as file:
+            file.write(image.tobytes())
+        manifest["pages"].append({"file": file_name, "width": image.width, "height": image.height})
+    for old in os.listdir(directory):
+        if old.startswith("page_") and old not in {page_meta["file"] for page_meta in manifest["pages"]}:
+            os.remove(os.path.join(directory, old))
+
+    temp = os.path.join(directory, MANIFEST + ".tmp")
+    with open(temp, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False)
+    os.replace(temp, os.path.join(directory, MANIFEST))
+    print(
+        f"Кэш глифов: шрифтов {len(manifest['fonts'])}, глифов {len(entries)}, "
+        f"страниц {len(pages)}, {time.perf_counter() - start_time:.3f} с"
+    )
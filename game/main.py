@@ -1,4 +1,10 @@
+import startup
+
+startup.begin()
+
 from views.menu import main
 
+startup.mark("импорт меню")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,305 @@
+# Кэш карт: TMX разбирается один раз и сохраняется в .npz рядом с игрой.
+# В бандле - спрайты слоёв (центр, размер, угол, номер текстуры), пиксели
+# всех различных тайлов, стены, точки спавна и карта занятости тайлов для
+# WallGrid, так что при загрузке не разбираются ни XML, ни PNG тайлсетов.
+# Имя бандла содержит хэш TMX вместе с его тайлсетами (.tsx и картинками),
+# поэтому изменённая карта или тайлсет просто не найдёт свой бандл
+# и будет разобрана заново.
+# Пересобрать все карты заранее: python -m mapcache из каталога game.
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import os
+import time
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from simulation import MapData
+from spatial import WallGrid
+
+TILEMAP_DIR = "../assets/tilemaps"
+CACHE_DIR = "cache/maps"
+# меняется вместе с форматом бандла, старые бандлы тогда не подходят
+BUNDLE_VERSION = 1
+
+LAYERS = ("walls", "spawn", "decorations", "background")
+
+
+@dataclass
+class MapBundle:
+    tile_size: int
+    width: int
+    height: int
+    # (хэш изображения, порядок вершин после отражений тайла)
+    textures: List[list] = field(default_factory=list)
+    # RGBA-пиксели тайлов, по одному массиву на запись textures
+    images: List[np.ndarray] = field(default_factory=list)
+    # слой: (массив n x 5 - center_x, center_y, width, height, angle; номера текстур)
+    layers: Dict[str, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict)
+    walls: np.ndarray = None
+    spawn_points: np.ndarray = None
+    solid: np.ndarray = None
+
+    def map_data(self):
+        return MapData(
+            walls=[tuple(wall) for wall in self.walls.tolist()],
+            spawn_points=[tuple(point) for point in self.spawn_points.tolist()],
+            tile_size=self.tile_size,
+            solid=self.solid.tobytes(),
+        )
+
+
+def dependencies(path):
+    # файлы, из которых собирается карта: внешние тайлсеты .tsx и картинки
+    # тайлсетов и слоёв - из самого TMX и из каждого .tsx; пути в атрибутах
+    # source считаются от файла, в котором записаны
+    found = []
+    pending = [path]
+    while pending:
+        current = pending.pop()
+        try:
+            root = ElementTree.parse(current).getroot()
+        except (OSError, ElementTree.ParseError):
+            # битый файл сам не разберётся в compile_map, хэш ему не нужен
+            continue
+        base = os.path.dirname(current)
+        for tag in ("tileset", "image"):
+            for element in root.iter(tag):
+                source = element.get("source")
+                if not source:
+                    continue
+                source = os.path.normpath(os.path.join(base, source))
+                if source not in found:
+                    found.append(source)
+                    if tag == "tileset":
+                        pending.append(source)
+    return found
+
+
+def source_hash(path):
+    digest = hashlib.sha1(str(BUNDLE_VERSION).encode())
+    base = os.path.dirname(path)
+    for source in [path] + dependencies(path):
+        digest.update(os.path.relpath(source, base).encode("utf-8"))
+        try:
+            with open(source, "rb") as file:
+                digest.update(file.read())
+        except OSError:
+            # пропавший тайлсет тоже меняет ключ
+            digest.update(b"missing")
+    return digest.hexdigest()[:16]
+
+
+def vertex_order(texture):
+    # порядок вершин тайла после отражений. arcade держит его в приватном
+    # поле, поэтому обращение к нему только здесь; без поля порядок берётся
+    # из публичного atlas_name вида "хэш|(0, 1, 2, 3)"
+    order = getattr(texture, "_vertex_order", None)
+    if order is None:
+        order = ast.literal_eval(texture.atlas_name.rsplit("|", 1)[1])
+    return tuple(order)
+
+
+def bundle_path(path, digest):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{name}-{digest}.npz")
+
+
+def compile_map(path):
+    # единственное место, где нужен разбор TMX через arcade
+    import arcade
+
+    # lazy: списки спрайтов без GL-буферов, разбор можно вести в фоновом потоке
+    tile_map = arcade.load_tilemap(path, scaling=1.0, lazy=True)
+    textures = []
+    images = []
+    texture_ids = {}
+    layers = {}
+    for name in LAYERS:
+        sprites = tile_map.sprite_lists.get(name)
+        if not sprites:
+            continue
+        rows = np.zeros((len(sprites), 5))
+        ids = np.zeros(len(sprites), dtype=np.int32)
+        for i, sprite in enumerate(sprites):
+            # у анимированных тайлов сохраняется только текущий кадр
+            texture = sprite.texture
+            key = (texture.image_data.hash, vertex_order(texture))
+            if key not in texture_ids:
+                texture_ids[key] = len(textures)
+                textures.append([key[0], list(key[1])])
+                images.append(np.asarray(texture.image.convert("RGBA")))
+            rows[i] = (sprite.center_x, sprite.center_y, sprite.width, sprite.height, sprite.angle)
+            ids[i] = texture_ids[key]
+        layers[name] = (rows, ids)
+
+    tile_size = int(tile_map.tile_width * tile_map.scaling)
+    walls = np.zeros((0, 4))
+    if "walls" in layers:
+        rows = layers["walls"][0]
+        walls = np.column_stack([rows[:, 0], rows[:, 1], rows[:, 2] / 2, rows[:, 3] / 2])
+    spawn_points = np.zeros((0, 2))
+    if "spawn" in layers:
+        spawn_points = layers["spawn"][0][:, :2].copy()
+    grid = WallGrid([tuple(wall) for wall in walls.tolist()], tile_size)
+    solid = np.frombuffer(bytes(grid.solid), dtype=np.uint8).copy()
+
+    return MapBundle(
+        tile_size=tile_size,
+        width=tile_map.width,
+        height=tile_map.height,
+        textures=textures,
+        images=images,
+        layers=layers,
+        walls=walls,
+        spawn_points=spawn_points,
+        solid=solid,
+    )
+
+
+def save_bundle(bundle, path):
+    meta = {
+        "version": BUNDLE_VERSION,
+        "tile_size": bundle.tile_size,
+        "width": bundle.width,
+        "height": bundle.height,
+        "textures": bundle.textures,
+        "layers": list(bundle.layers),
+    }
+    arrays = {
+        "meta": np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8),
+        "walls": bundle.walls,
+        "spawn_points": bundle.spawn_points,
+        "solid": bundle.solid,
+    }
+    for i, image in enumerate(bundle.images):
+        arrays[f"image_{i}"] = image
+    for name, (rows, ids) in bundle.layers.items():
+        arrays[f"{name}_sprites"] = rows
+        arrays[f"{name}_textures"] = ids
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # пишем во временный файл и переименовываем, чтобы не оставить битый бандл
+    temp = path + ".tmp"
+    with open(temp, "wb") as file:
+        np.savez(file, **arrays)
+    os.replace(temp, path)
+
+
+def load_bundle(path):
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+        if meta["version"] != BUNDLE_VERSION:
+            raise ValueError(f"Бандл версии {meta['version']}, нужна {BUNDLE_VERSION}")
+        return MapBundle(
+            tile_size=meta["tile_size"],
+            width=meta["width"],
+            height=meta["height"],
+            textures=meta["textures"],
+            images=[data[f"image_{i}"] for i in range(len(meta["textures"]))],
+            layers={
+                name: (data[f"{name}_sprites"], data[f"{name}_textures"])
+                for name in meta["layers"]
+            },
+            walls=data["walls"],
+            spawn_points=data["spawn_points"],
+            solid=data["solid"],
+        )
+
+
+def remove_stale(path, keep):
+    name = os.path.splitext(os.path.basename(path))[0]
+    for old in glob.glob(os.path.join(CACHE_DIR, f"{name}-*.npz")):
+        if os.path.abspath(old) != os.path.abspath(keep):
+            os.remove(old)
+
+
+def load_map(path):
+    # бандл из кэша, а если его нет - разбор TMX и запись бандла
+    cached = bundle_path(path, source_hash(path))
+    if os.path.exists(cached):
+        try:
+            return load_bundle(cached)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Бандл карты повреждён, собираю заново: {e}")
+    bundle = compile_map(path)
+    try:
+        save_bundle(bundle, cached)
+        remove_stale(path, cached)
+    except OSError as e:
+        print(f"Не удалось сохранить бандл карты: {e}")
+    return bundle
+
+
+def bundle_textures(bundle, atlas=None):
+    # текстуры тайлов без OpenGL; тайл, который есть в атласе, берётся оттуда
+    # (уже готовая текстура, общая для всех матчей), остальные - из пикселей бандла
+    import arcade
+    from arcade.texture import transforms
+    from PIL import Image
+
+    # любое отражение тайла в Tiled - одно из восьми преобразований квадрата
+    orientations = {(0, 1, 2, 3): None}
+    for transform in (
+        transforms.FlipLeftRightTransform, transforms.FlipTopBottomTransform,
+        transforms.TransposeTransform, transforms.TransverseTransform,
+        transforms.Rotate90Transform, transforms.Rotate180Transform, transforms.Rotate270Transform,
+    ):
+        orientations[transform.transform_vertex_order((0, 1, 2, 3))] = transform
+
+    textures = []
+    for (image_hash, vertex_order), image in zip(bundle.textures, bundle.images):
+        if atlas is not None and image_hash in atlas:
+            texture = atlas.texture(image_hash)
+        else:
+            texture = arcade.Texture(Image.fromarray(image), hash=image_hash)
+        transform = orientations.get(tuple(vertex_order))
+        if transform is not None:
+            texture = texture.transform(transform)
+        textures.append(texture)
+    return textures
+
+
+def build_sprite_lists(bundle, textures=None):
+    import arcade
+
+    if textures is None:
+        textures = bundle_textures(bundle)
+    sprite_lists = {}
+    for name in LAYERS:
+        sprite_list = arcade.SpriteList(use_spatial_hash=name == "walls")
+        if name in bundle.layers:
+            rows, ids = bundle.layers[name]
+            for (x, y, width, height, angle), texture_id in zip(rows.tolist(), ids.tolist()):
+                sprite = arcade.Sprite(textures[texture_id], center_x=x, center_y=y, angle=angle)
+                sprite.width = width
+                sprite.height = height
+                sprite_list.append(sprite)
+        sprite_lists[name] = sprite_list
+    return sprite_lists
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*", help="файлы TMX, по умолчанию все из " + TILEMAP_DIR)
+    args = parser.parse_args()
+
+    for path in args.paths or sorted(glob.glob(os.path.join(TILEMAP_DIR, "*.tmx"))):
+        start = time.perf_counter()
+        try:
+            bundle = load_map(path)
+        except Exception as e:
+            print(f"{path}: ошибка разбора: {e}")
+            continue
+        print(
+            f"{path}: {bundle.width}x{bundle.height} тайлов, стен {len(bundle.walls)}, "
+            f"точек спавна {len(bundle.spawn_points)}, {time.perf_counter() - start:.3f} с"
+        )
+
+
+if __name__ == "__main__":
+    main()
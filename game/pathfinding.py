@@ -0,0 +1,123 @@
+import heapq
+
+import numpy as np
+
+# Поле направлений по тайлам сетки стен: один проход Дейкстры от тайла
+# игрока, после чего любой враг узнаёт следующий шаг за O(1) по своему тайлу.
+# Пересчитывается только когда игрок переходит в другой тайл.
+
+# цена шага по прямой и по диагонали (примерно 1 и sqrt(2))
+STRAIGHT = 10
+DIAGONAL = 14
+
+NEIGHBOURS = (
+    (1, 0, STRAIGHT), (-1, 0, STRAIGHT), (0, 1, STRAIGHT), (0, -1, STRAIGHT),
+    (1, 1, DIAGONAL), (1, -1, DIAGONAL), (-1, 1, DIAGONAL), (-1, -1, DIAGONAL),
+)
+
+
+class FlowField:
+    def __init__(self, wall_grid):
+        self.grid = wall_grid
+        self.cols = wall_grid.cols
+        self.rows = wall_grid.rows
+        self.goal = None
+        self.rebuilds = 0
+        size = self.cols * self.rows
+        # куда идти из тайла: центр следующего тайла, NaN - прямо к игроку
+        self.next_x = np.full(size, np.nan)
+        self.next_y = np.full(size, np.nan)
+        self.distance = np.full(size, -1, dtype=np.int64)
+        # соседи каждого тайла с ценой шага; стены не меняются, так что
+        # проверки границ, стен и срезанных углов делаются один раз, а не
+        # в каждой перестройке
+        self.edges = [self.tile_edges(index) for index in range(size)]
+        # центры тайлов: из соседа шагаем в центр тайла, откуда его достали
+        index = np.arange(size)
+        self.centre_x = wall_grid.left + (index % self.cols + 0.5) * wall_grid.cell_size
+        self.centre_y = wall_grid.bottom + (index // self.cols + 0.5) * wall_grid.cell_size
+
+    def tile_edges(self, index):
+        cols, rows = self.cols, self.rows
+        solid = self.grid.solid
+        row, col = divmod(index, cols)
+        edges = []
+        for dc, dr, cost in NEIGHBOURS:
+            c, r = col + dc, row + dr
+            if not (0 <= c < cols and 0 <= r < rows):
+                continue
+            neighbour = r * cols + c
+            if solid[neighbour]:
+                continue
+            # по диагонали только если оба соседних тайла свободны, иначе срезаем угол стены
+            if dc and dr and (solid[row * cols + c] or solid[r * cols + col]):
+                continue
+            edges.append((neighbour, cost))
+        return edges
+
+    def update(self, player_x, player_y):
+        col, row = self.grid.tile_of(player_x, player_y)
+        goal = (col, row)
+        if goal == self.goal:
+            return False
+        self.goal = goal
+        self.rebuild(col, row)
+        return True
+
+    def rebuild(self, goal_col, goal_row):
+        cols, rows = self.cols, self.rows
+        distance = [-1] * (cols * rows)
+        self.next_x.fill(np.nan)
+        self.next_y.fill(np.nan)
+        self.rebuilds += 1
+        if not (0 <= goal_col < cols and 0 <= goal_row < rows) or self.grid.solid[goal_row * cols + goal_col]:
+            # игрок вне сетки: все идут прямо на него, как раньше
+            self.distance[:] = distance
+            return
+
+        goal = goal_row * cols + goal_col
+        distance[goal] = 0
+        # из какого тайла достали каждый тайл; -1 - ниоткуда
+        parent = [-1] * (cols * rows)
+        edges = self.edges
+        # цены шагов целые, так что очередь - корзины тайлов по расстоянию;
+        # в корзине тайлы идут по номеру, как их снимала бы куча (dist, index)
+        buckets = {0: [goal]}
+        queue = [0]
+        while queue:
+            dist = heapq.heappop(queue)
+            for index in sorted(buckets.pop(dist)):
+                if dist > distance[index]:
+                    continue
+                for neighbour, cost in edges[index]:
+                    new_dist = dist + cost
+                    old = distance[neighbour]
+                    if old < 0 or new_dist < old:
+                        distance[neighbour] = new_dist
+                        parent[neighbour] = index
+                        bucket = buckets.get(new_dist)
+                        if bucket is None:
+                            buckets[new_dist] = [neighbour]
+                            heapq.heappush(queue, new_dist)
+                        else:
+                            bucket.append(neighbour)
+        self.distance[:] = distance
+        parent = np.array(parent)
+        reached = np.flatnonzero(parent >= 0)
+        self.next_x[reached] = self.centre_x[parent[reached]]
+        self.next_y[reached] = self.centre_y[parent[reached]]
+
+    def targets(self, xs, ys, player_x, player_y):
+        # точки, к которым враги идут в этом тике; из тайла игрока,
+        # недостижимых тайлов и за пределами сетки - прямо к игроку
+        grid = self.grid
+        cols = ((xs - grid.left) // grid.cell_size).astype(np.int64)
+        rows = ((ys - grid.bottom) // grid.cell_size).astype(np.int64)
+        inside = (cols >= 0) & (cols < self.cols) & (rows >= 0) & (rows < self.rows)
+        index = np.where(inside, rows * self.cols + cols, 0)
+        target_x = np.where(inside, self.next_x[index], np.nan)
+        target_y = np.where(inside, self.next_y[index], np.nan)
+        direct = np.isnan(target_x)
+        target_x[direct] = player_x
+        target_y[direct] = player_y
+        return target_x, target_y
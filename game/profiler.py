@@ -0,0 +1,68 @@
+import time
+
+import numpy as np
+
+# Время по фазам кадра. mark(phase) добавляет к фазе время с прошлой отметки,
+# end_frame() кладёт строку кадра в кольцевой буфер фиксированного размера.
+# Выключенный профилировщик сводится к одной проверке флага на отметку.
+
+SIM_PHASES = (
+    "move_player", "update_bullets", "update_enemies", "separate_enemies",
+    "push_walls", "spawn_enemies", "check_collisions", "flush", "events",
+)
+DRAW_PHASES = (
+    "draw_ground", "draw_enemies", "draw_bullets", "draw_particles", "draw_walls",
+    "draw_player", "draw_ui",
+)
+
+FRAME_CAPACITY = 600
+
+
+class FrameProfiler:
+    def __init__(self, phases=SIM_PHASES + DRAW_PHASES, capacity=FRAME_CAPACITY):
+        self.phases = tuple(phases)
+        self.slots = {phase: i for i, phase in enumerate(self.phases)}
+        self.capacity = capacity
+        # секунды по фазам, строка на кадр
+        self.samples = np.zeros((capacity, len(self.phases)))
+        self.current = [0.0] * len(self.phases)
+        self.frames = 0
+        self.enabled = False
+        self.last = 0.0
+
+    def reset(self):
+        self.samples.fill(0)
+        self.current = [0.0] * len(self.phases)
+        self.frames = 0
+        self.last = time.perf_counter()
+
+    def start(self):
+        if self.enabled:
+            self.last = time.perf_counter()
+
+    def mark(self, phase):
+        if self.enabled:
+            now = time.perf_counter()
+            self.current[self.slots[phase]] += now - self.last
+            self.last = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.samples[self.frames % self.capacity] = self.current
+        self.current = [0.0] * len(self.phases)
+        self.frames += 1
+
+    def recent(self):
+        # заполненная часть буфера, порядок кадров здесь не важен
+        return self.samples[:min(self.frames, self.capacity)]
+
+    def percentiles(self, qs=(50, 95, 99)):
+        # {фаза: (p50, p95, p99)} в миллисекундах, плюс "frame" - сумма по фазам
+        rows = self.recent()
+        if not len(rows):
+            return {}
+        columns = np.column_stack([rows, rows.sum(axis=1)]) * 1000
+        values = np.percentile(columns, qs, axis=0)
+        names = self.phases + ("frame",)
+        return {name: tuple(values[:, i].tolist()) for i, name in enumerate(names)}
@@ -0,0 +1,109 @@
+from collections import deque
+from dataclasses import dataclass
+
+# Регулятор качества: по скользящему окну стоимости кадра (обновление плюс
+# отрисовка, без ожидания vsync) снижает или повышает детализацию.
+# Пороги вниз и вверх разные, а после любой смены уровень держится
+# не меньше HOLD_FRAMES кадров, поэтому качество не прыгает туда-сюда
+# на границе. Каждое решение записывается в decisions и видно в оверлее F3,
+# F4 закрепляет уровни вручную по очереди.
+
+TARGET_FPS = 60
+WINDOW_FRAMES = 60
+# доля кадра при целевой частоте: выше - понижаем, ниже - можно повышать
+DOWNGRADE_SHARE = 0.85
+UPGRADE_SHARE = 0.5
+HOLD_FRAMES = 120
+# повышать осторожнее, чем понижать
+UPGRADE_HOLD_FRAMES = 300
+# какой процентиль окна сравнивается с порогами
+WINDOW_PERCENTILE = 90
+DECISION_LOG = 20
+
+
+@dataclass
+class QualityLevel:
+    name: str
+    # "full" - глаза и контур, "plain" - только тело
+    enemy_detail: str
+    # "all", "damaged" - только у раненых, "none"
+    health_bars: str
+    particle_budget: int
+    # HUD перекладывается раз в столько кадров
+    hud_interval: int
+
+
+LEVELS = (
+    QualityLevel("высокое", "full", "all", 256, 1),
+    QualityLevel("среднее", "full", "damaged", 128, 2),
+    QualityLevel("низкое", "plain", "damaged", 48, 6),
+    QualityLevel("минимум", "plain", "none", 0, 15),
+)
+
+
+class QualityGovernor:
+    def __init__(self, target_fps=TARGET_FPS, levels=LEVELS, window=WINDOW_FRAMES):
+        self.levels = levels
+        self.budget = 1 / target_fps
+        self.costs = deque(maxlen=window)
+        self.index = 0
+        self.frames = 0
+        self.last_change = 0
+        # (кадр, с какого уровня, на какой, процентиль стоимости в мс)
+        self.decisions = deque(maxlen=DECISION_LOG)
+        self.enabled = True
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def window_cost(self):
+        if not self.costs:
+            return 0.0
+        ordered = sorted(self.costs)
+        return ordered[min(len(ordered) - 1, len(ordered) * WINDOW_PERCENTILE // 100)]
+
+    def frame(self, cost):
+        # cost - секунды работы за кадр; True, если уровень сменился
+        self.frames += 1
+        self.costs.append(cost)
+        if not self.enabled or len(self.costs) < self.costs.maxlen:
+            return False
+        held = self.frames - self.last_change
+        load = self.window_cost() / self.budget
+        if load > DOWNGRADE_SHARE and held >= HOLD_FRAMES and self.index < len(self.levels) - 1:
+            return self.change(self.index + 1)
+        if load < UPGRADE_SHARE and held >= UPGRADE_HOLD_FRAMES and self.index > 0:
+            return self.change(self.index - 1)
+        return False
+
+    def change(self, index):
+        cost_ms = self.window_cost() * 1000
+        self.decisions.append((self.frames, self.level.name, self.levels[index].name, round(cost_ms, 2)))
+        print(f"Качество: {self.level.name} -> {self.levels[index].name} (p{WINDOW_PERCENTILE} кадра {cost_ms:.1f} мс)")
+        self.index = index
+        self.last_change = self.frames
+        # окно начинается заново: старые кадры мерились на прежнем уровне
+        self.costs.clear()
+        return True
+
+    def cycle(self):
+        # F4: авто -> каждый уровень вручную по очереди -> снова авто
+        if self.enabled:
+            self.enabled = False
+            self.change(0)
+        elif self.index + 1 < len(self.levels):
+            self.change(self.index + 1)
+        else:
+            self.enabled = True
+            self.costs.clear()
+            self.last_change = self.frames
+
+    def status(self):
+        text = (
+            f"качество {self.level.name}  p{WINDOW_PERCENTILE} {self.window_cost() * 1000:.1f}"
+            f"/{self.budget * 1000:.1f} мс"
+        )
+        if not self.enabled:
+            text += "  (закреплено)"
+        return text
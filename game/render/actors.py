@@ -0,0 +1,175 @@
+import math
+
+import arcade
+from PIL import Image, ImageDraw
+
+# Враги и игрок рисуются спрайтами из заранее отрисованных текстур:
+# все враги вместе с полосками здоровья - один SpriteList и один вызов
+# отрисовки, сколько бы их ни было. Разные радиусы - это масштаб спрайта.
+
+ENEMY_RADIUS = 20
+# во сколько раз текстура крупнее спрайта при масштабе 1
+TEXTURE_SCALE = 2
+# сглаживание: рисуем крупнее и уменьшаем
+SUPERSAMPLE = 4
+
+ENEMY_BAR_WIDTH = 40
+PLAYER_BAR_WIDTH = 60
+
+
+def _circle(draw, cx, cy, radius, fill=None, outline=None, width=0):
+    draw.ellipse((cx - radius, cy - radius, cx + radius, cy + radius),
+                 fill=fill, outline=outline, width=width)
+
+
+def _bake(name, half_size, paint):
+    # paint(draw, k, c) рисует в координатах относительно центра,
+    # k - множитель масштаба, c - центр холста
+    k = TEXTURE_SCALE * SUPERSAMPLE
+    size = int(half_size * 2 * k)
+    image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    paint(ImageDraw.Draw(image), k, size / 2)
+    image = image.resize((size // SUPERSAMPLE, size // SUPERSAMPLE), Image.LANCZOS)
+    return arcade.Texture(image, hash=name)
+
+
+def enemy_texture(color, detail="full"):
+    # detail "plain" - тело без глаз и контура для низкого качества
+    def paint(draw, k, c):
+        if detail == "plain":
+            _circle(draw, c, c, ENEMY_RADIUS * k, fill=tuple(color))
+            return
+        # контур шириной 2 по окружности, как draw_circle_outline
+        _circle(draw, c, c, (ENEMY_RADIUS + 1) * k, fill=arcade.color.BLACK)
+        _circle(draw, c, c, (ENEMY_RADIUS - 1) * k, fill=tuple(color))
+        for eye_x in (-8, 8):
+            _circle(draw, c + eye_x * k, c - 5 * k, 5 * k, fill=arcade.color.WHITE)
+            _circle(draw, c + eye_x * k, c - 5 * k, 2 * k, fill=arcade.color.BLACK)
+
+    return _bake(f"enemy-{tuple(color)}-{detail}", ENEMY_RADIUS + 2, paint)
+
+
+def player_texture(color, radius):
+    # глаз и ствол смотрят вправо, направление задаёт поворот спрайта
+    def paint(draw, k, c):
+        _circle(draw, c, c, (radius + 1.5) * k, fill=arcade.color.BLACK)
+        _circle(draw, c, c, (radius - 1.5) * k, fill=tuple(color))
+        _circle(draw, c + 15 * k, c, 8 * k, fill=arcade.color.WHITE)
+        _circle(draw, c + 15 * k, c, 4 * k, fill=arcade.color.BLACK)
+        draw.rectangle((c, c - 2 * k, c + 30 * k, c + 2 * k), fill=arcade.color.BLACK)
+
+    return _bake(f"player-{tuple(color)}-{radius}", max(radius + 2, 32), paint)
+
+
+def bar_texture():
+    return arcade.Texture(Image.new("RGBA", (4, 4), (255, 255, 255, 255)), hash="bar-white")
+
+
+def bake_textures(player_color, player_radius, enemy_colors=((255, 0, 0, 255),)):
+    # только PIL, без OpenGL: можно заранее в фоновом потоке;
+    # ключи те же, что у ActorRenderer.texture
+    textures = {
+        (tuple(color), detail): enemy_texture(color, detail)
+        for color in enemy_colors for detail in ("full", "plain")
+    }
+    textures[("player", tuple(player_color), player_radius)] = player_texture(player_color, player_radius)
+    return textures
+
+
+class ActorRenderer:
+    def __init__(self, textures=None):
+        self.enemy_list = arcade.SpriteList()
+        self.player_list = arcade.SpriteList()
+        self.textures = dict(textures or {})
+        self.bar = bar_texture()
+        # на каждого врага тройка спрайтов: тело, фон полоски, полоска
+        self.enemy_sprites = []
+        self.active = 0
+
+        self.player_body = arcade.Sprite(self.bar)
+        self.player_bar_back = self.make_bar(arcade.color.DARK_GRAY)
+        self.player_bar = self.make_bar(arcade.color.GREEN)
+        self.player_list.append(self.player_body)
+        self.player_list.append(self.player_bar_back)
+        self.player_list.append(self.player_bar)
+
+    def make_bar(self, color):
+        sprite = arcade.Sprite(self.bar)
+        sprite.color = color
+        return sprite
+
+    def texture(self, key, factory):
+        texture = self.textures.get(key)
+        if texture is None:
+            texture = self.textures[key] = factory()
+        return texture
+
+    def grow(self, count):
+        while len(self.enemy_sprites) < count:
+            trio = (
+                arcade.Sprite(self.bar),
+                self.make_bar(arcade.color.DARK_GRAY),
+                self.make_bar(arcade.color.GREEN),
+            )
+            self.enemy_sprites.append(trio)
+            for sprite in trio:
+                self.enemy_list.append(sprite)
+
+    def draw_enemies(self, enemies, xs, ys, detail="full", health_bars="all"):
+        # health_bars: "all", "damaged" - только у раненых, "none"
+        n = len(enemies)
+        self.grow(n)
+        radius = enemies.radius[:n].tolist()
+        health = enemies.health[:n].tolist()
+        max_health = enemies.max_health[:n].tolist()
+        colors = enemies.color[:n].tolist()
+        for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+            body, back, front = self.enemy_sprites[i]
+            color = tuple(colors[i])
+            texture = self.texture((color, detail), lambda: enemy_texture(color, detail))
+            if body.texture is not texture:
+                body.texture = texture
+            body.scale = radius[i] / (ENEMY_RADIUS * TEXTURE_SCALE)
+            body.position = (x, y)
+            if i >= self.active:
+                body.visible = True
+
+            # скрытые полоски не пересчитываются
+            bars = health_bars == "all" or (health_bars == "damaged" and health[i] < max_health[i])
+            if back.visible != bars:
+                back.visible = front.visible = bars
+            if not bars:
+                continue
+            # полоски стоят там же, где их рисовал draw_lbwh_rectangle_filled
+            ratio = max(0.0, health[i] / max_health[i])
+            bar_y = y + radius[i] + 15
+            back.width, back.height = ENEMY_BAR_WIDTH, 5
+            back.position = (x + ENEMY_BAR_WIDTH / 2, bar_y + 2.5)
+            width = ENEMY_BAR_WIDTH * ratio
+            front.width, front.height = max(width, 0.01), 3
+            front.position = (x - ENEMY_BAR_WIDTH / 2 + width, bar_y + 1.5)
+        for i in range(n, self.active):
+            for sprite in self.enemy_sprites[i]:
+                sprite.visible = False
+        self.active = n
+        self.enemy_list.draw()
+
+    def draw_player(self, x, y, aim_angle, radius, body_color, health_ratio):
+        body = self.player_body
+        body.texture = self.texture(
+            ("player", tuple(body_color), radius),
+            lambda: player_texture(body_color, radius),
+        )
+        body.scale = 1 / TEXTURE_SCALE
+        body.position = (x, y)
+        # угол спрайта в arcade отсчитывается по часовой стрелке
+        body.angle = -math.degrees(aim_angle)
+
+        bar_y = y + radius + 25
+        self.player_bar_back.width, self.player_bar_back.height = PLAYER_BAR_WIDTH, 8
+        self.player_bar_back.position = (x, bar_y + 4)
+        width = PLAYER_BAR_WIDTH * max(0.0, health_ratio)
+        self.player_bar.width, self.player_bar.height = max(width, 0.01), 6
+        self.player_bar.position = (x - PLAYER_BAR_WIDTH / 2 + width / 2, bar_y + 3)
+        self.player_bar.color = arcade.color.GREEN if health_ratio > 0.3 else arcade.color.RED
+        self.player_list.draw()
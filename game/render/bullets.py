@@ -0,0 +1,106 @@
+import numpy as np
+from arcade.gl import BufferDescription
+
+# Все пули рисуются одним инстанс-вызовом: квадрат из четырёх вершин
+# повторяется для каждой пули, а круг вырезает фрагментный шейдер.
+# Буфер экземпляров переписывается на месте и растёт только вдвое.
+
+VERTEX_SHADER = """
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+in vec2 in_corner;
+in vec2 in_pos;
+in float in_radius;
+in vec4 in_color;
+
+out vec2 v_uv;
+out vec4 v_color;
+
+void main() {
+    // запас в пиксель под сглаженный край
+    float size = in_radius + 1.0;
+    v_uv = in_corner * size / in_radius;
+    v_color = in_color;
+    gl_Position = window.projection * window.view * vec4(in_pos + in_corner * size, 0.0, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330
+
+in vec2 v_uv;
+in vec4 v_color;
+
+out vec4 fragColor;
+
+void main() {
+    float dist = length(v_uv);
+    float edge = fwidth(dist);
+    float alpha = 1.0 - smoothstep(1.0 - edge, 1.0 + edge, dist);
+    if (alpha <= 0.0) {
+        discard;
+    }
+    fragColor = vec4(v_color.rgb, v_color.a * alpha);
+}
+"""
+
+INSTANCE_DTYPE = np.dtype([
+    ("pos", np.float32, 2),
+    ("radius", np.float32),
+    ("color", np.uint8, 4),
+])
+
+
+class CircleRenderer:
+    def __init__(self, ctx, capacity=1024):
+        self.ctx = ctx
+        self.program = ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
+        corners = np.array([-1, -1, 1, -1, -1, 1, 1, 1], dtype=np.float32)
+        self.quad = ctx.buffer(data=corners.tobytes())
+        self.capacity = 0
+        self.data = None
+        self.instances = None
+        self.geometry = None
+        self.reserve(capacity)
+
+    def reserve(self, capacity):
+        if capacity <= self.capacity:
+            return
+        while self.capacity < capacity:
+            self.capacity = max(self.capacity * 2, capacity)
+        self.data = np.zeros(self.capacity, dtype=INSTANCE_DTYPE)
+        self.instances = self.ctx.buffer(reserve=self.capacity * INSTANCE_DTYPE.itemsize, usage="stream")
+        self.geometry = self.ctx.geometry(
+            [
+                BufferDescription(self.quad, "2f", ["in_corner"]),
+                BufferDescription(
+                    self.instances, "2f 1f 4f1", ["in_pos", "in_radius", "in_color"],
+                    normalized=["in_color"], instanced=True,
+                ),
+            ],
+            mode=self.ctx.TRIANGLE_STRIP,
+        )
+
+    def draw(self, xs, ys, radius, colors):
+        n = len(xs)
+        if not n:
+            return
+        self.reserve(n)
+        data = self.data[:n]
+        data["pos"][:, 0] = xs
+        data["pos"][:, 1] = ys
+        data["radius"] = radius
+        data["color"] = colors
+        self.instances.write(data)
+        self.geometry.render(self.program, vertices=4, instances=n)
+
+
+class BulletRenderer(CircleRenderer):
+    def draw_bullets(self, bullets, xs, ys):
+        n = len(bullets)
+        self.draw(xs, ys, bullets.radius[:n], bullets.color[:n])
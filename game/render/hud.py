@@ -0,0 +1,92 @@
+import arcade
+from pyglet.graphics import Batch
+
+# Надписи HUD - постоянные arcade.Text в одном батче. Текст перекладывается
+# только когда меняется его значение, а весь HUD рисуется одним batch.draw().
+
+
+class Hud:
+    def __init__(self, width, height, username, level, weapon_name):
+        self.batch = Batch()
+        self.game_over_batch = Batch()
+        self.values = {}
+        # ссылки держим, иначе сборщик мусора уберёт надписи из батча
+        self.labels = []
+
+        self.labels.append(arcade.Text(
+            f"👤 {username}",
+            20, height - 40,
+            arcade.color.WHITE, 22,
+            font_name="arial", bold=True, batch=self.batch
+        ))
+        self.labels.append(arcade.Text(
+            f"Уровень {level}",
+            20, height - 40,
+            arcade.color.RED, 18,
+            font_name="arial", batch=self.batch
+        ))
+
+        self.stats = [
+            arcade.Text(
+                "",
+                width // 2 - 300 + i * 150,
+                height - 40,
+                arcade.color.RED, 20,
+                font_name="arial", batch=self.batch
+            )
+            for i in range(5)
+        ]
+        self.stats[4].text = weapon_name
+
+        # Для одарённых
+        self.labels.append(arcade.Text(
+            "WASD - движение | ЛКМ - стрельба | ESC - выход",
+            width // 2, 30,
+            arcade.color.LIGHT_GRAY, 18,
+            anchor_x="center", font_name="arial", batch=self.batch
+        ))
+
+        self.labels.append(arcade.Text(
+            "Game Over((",  # простите, шрифта не нашлось
+            width // 2, height // 2 + 90,
+            arcade.color.RED, 48,
+            anchor_x="center", bold=True, batch=self.game_over_batch
+        ))
+        self.final_score = arcade.Text(
+            "",
+            width // 2, height // 2 + 30,
+            arcade.color.WHITE, 32,
+            anchor_x="center", batch=self.game_over_batch
+        )
+        self.final_kills = arcade.Text(
+            "",
+            width // 2, height // 2 - 20,
+            arcade.color.WHITE, 24,
+            anchor_x="center", batch=self.game_over_batch
+        )
+        self.labels.append(arcade.Text(
+            "Нажмите ESC для выхода в меню",
+            width // 2, height // 2 - 80,
+            arcade.color.YELLOW, 20,
+            anchor_x="center", batch=self.game_over_batch
+        ))
+
+    def set(self, text, value):
+        # перекладка глифов только при смене значения
+        if self.values.get(id(text)) != value:
+            self.values[id(text)] = value
+            text.text = value
+
+    def update(self, health, max_health, score, game_time, kills):
+        self.set(self.stats[0], f"{health}/{max_health}")
+        self.set(self.stats[1], f"Счёт: {score}")
+        self.set(self.stats[2], f"Время: {int(game_time)}с")
+        self.set(self.stats[3], f"Убито: {kills}")
+
+    def draw(self):
+        self.batch.draw()
+
+    def draw_game_over(self, score, kills):
+        self.set(self.final_score, f"Ваш счёт: {score}")
+        self.set(self.final_kills, f"Убито врагов: {kills}")
+        self.game_over_batch.draw()
@@ -0,0 +1,108 @@
+import math
+
+import numpy as np
+
+from render.bullets import CircleRenderer
+
+# Частицы эффектов: искры попаданий, вспышки выстрелов, разлёт при убийстве.
+# Всё состояние - массивы фиксированной длины, заведённые один раз; новые
+# частицы пишутся по кругу, поэтому при нехватке места первыми пропадают
+# самые старые. За кадр рождается не больше frame_budget частиц: в тяжёлом
+# кадре эффекты беднеют, но не добавляют к нему работы.
+# Частицы - только картинка: они не влияют на симуляцию и повторы.
+
+PARTICLE_CAPACITY = 2048
+FRAME_BUDGET = 256
+# доля скорости, остающаяся через секунду
+DRAG = 0.05
+
+# эффект: (частиц, скорость от и до, жизнь от и до в секундах, радиус, цвет)
+EFFECTS = {
+    "hit": (6, 60, 220, 0.12, 0.3, 2.5, (255, 220, 90, 255)),
+    "kill": (24, 40, 260, 0.35, 0.7, 4.0, (200, 20, 20, 255)),
+    "shot": (4, 20, 120, 0.05, 0.1, 3.5, (255, 250, 200, 255)),
+}
+
+
+class ParticleSystem:
+    def __init__(self, capacity=PARTICLE_CAPACITY, frame_budget=FRAME_BUDGET, rng=None):
+        self.capacity = capacity
+        self.frame_budget = frame_budget
+        # свой генератор: случайность эффектов не трогает rng симуляции
+        self.rng = rng or np.random.default_rng()
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.life = np.zeros(capacity)
+        self.max_life = np.ones(capacity)
+        self.radius = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 4), dtype=np.uint8)
+        # следующее место для записи; перед ним - самые свежие частицы
+        self.head = 0
+        self.frame_left = frame_budget
+        self.live = 0
+        # частиц не родилось из-за бюджета кадра и вытеснено раньше срока
+        self.dropped = 0
+        self.culled = 0
+
+    def emit(self, kind, x, y, angle=None, spread=math.pi):
+        count, speed_min, speed_max, life_min, life_max, radius, color = EFFECTS[kind]
+        wanted = count
+        count = min(count, self.frame_left)
+        self.dropped += wanted - count
+        if count <= 0:
+            return
+        self.frame_left -= count
+
+        slots = (self.head + np.arange(count)) % self.capacity
+        self.head = (self.head + count) % self.capacity
+        self.culled += int(np.count_nonzero(self.life[slots] > 0))
+
+        rng = self.rng
+        if angle is None:
+            angles = rng.uniform(0, 2 * math.pi, count)
+        else:
+            angles = angle + rng.uniform(-spread, spread, count)
+        speeds = rng.uniform(speed_min, speed_max, count)
+        life = rng.uniform(life_min, life_max, count)
+        self.x[slots] = x
+        self.y[slots] = y
+        self.vx[slots] = np.cos(angles) * speeds
+        self.vy[slots] = np.sin(angles) * speeds
+        self.life[slots] = life
+        self.max_life[slots] = life
+        self.radius[slots] = radius
+        self.color[slots] = color
+
+    def update(self, delta_time):
+        self.frame_left = self.frame_budget
+        alive = self.life > 0
+        self.live = int(np.count_nonzero(alive))
+        if not self.live:
+            return
+        self.x += self.vx * delta_time
+        self.y += self.vy * delta_time
+        drag = DRAG ** delta_time
+        self.vx *= drag
+        self.vy *= drag
+        self.life -= delta_time
+
+    def clear(self):
+        self.life[:] = 0
+        self.live = 0
+
+
+class ParticleRenderer(CircleRenderer):
+    def draw_particles(self, particles):
+        if not particles.live:
+            return
+        alive = np.flatnonzero(particles.life > 0)
+        # частица уменьшается и гаснет к концу жизни
+        fade = particles.life[alive] / particles.max_life[alive]
+        colors = particles.color[alive]
+        colors[:, 3] = (colors[:, 3] * fade).astype(np.uint8)
+        self.draw(
+            particles.x[alive], particles.y[alive],
+            particles.radius[alive] * (0.4 + 0.6 * fade), colors,
+        )
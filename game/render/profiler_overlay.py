@@ -0,0 +1,72 @@
+import arcade
+from pyglet.graphics import Batch
+
+# Оверлей профилировщика (F3): p50/p95/p99 по фазам кадра, уровень качества
+# с последними его сменами и число объектов.
+# Процентили пересчитываются раз в REFRESH_FRAMES кадров, в остальное время
+# рисуется готовый батч.
+
+REFRESH_FRAMES = 30
+LINE_HEIGHT = 16
+PANEL_WIDTH = 380
+# сколько последних решений регулятора качества показывать
+DECISION_LINES = 3
+
+
+class ProfilerOverlay:
+    def __init__(self, profiler, left, top):
+        self.profiler = profiler
+        self.left = left
+        self.top = top
+        self.batch = Batch()
+        self.visible = False
+        self.last_refresh = -REFRESH_FRAMES
+        names = profiler.phases + ("frame",)
+        self.lines = [
+            arcade.Text(
+                "", left + 8, top - (i + 1) * LINE_HEIGHT,
+                arcade.color.WHITE, 11,
+                font_name=("courier new", "dejavu sans mono", "monospace"), batch=self.batch
+            )
+            for i in range(len(names) + 3 + DECISION_LINES)
+        ]
+        self.height = (len(self.lines) + 1) * LINE_HEIGHT
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.profiler.enabled = self.visible
+        if self.visible:
+            self.profiler.reset()
+            self.last_refresh = -REFRESH_FRAMES
+
+    def refresh(self, enemies, bullets, particles, quality):
+        stats = self.profiler.percentiles()
+        self.lines[0].text = f"{'фаза, мс':<18}{'p50':>7}{'p95':>7}{'p99':>7}"
+        for line, (name, (p50, p95, p99)) in zip(self.lines[1:], stats.items()):
+            line.text = f"{name:<18}{p50:7.2f}{p95:7.2f}{p99:7.2f}"
+        # строки качества собираются только при обновлении, а не каждый кадр
+        status = self.lines[-2 - DECISION_LINES]
+        status.text = quality.status() if quality is not None else ""
+        decisions = list(quality.decisions)[-DECISION_LINES:] if quality is not None else []
+        for line, decision in zip(self.lines[-1 - DECISION_LINES:-1], decisions + [None] * DECISION_LINES):
+            if decision is None:
+                line.text = ""
+            else:
+                frame, before, after, cost_ms = decision
+                line.text = f"  кадр {frame}: {before} -> {after} ({cost_ms:.1f} мс)"
+        self.lines[-1].text = (
+            f"врагов {enemies}  пуль {bullets}  частиц {particles}"
+            f"  кадров {min(self.profiler.frames, self.profiler.capacity)}"
+        )
+
+    def draw(self, enemies, bullets, particles=0, quality=None):
+        if not self.visible:
+            return
+        if self.profiler.frames - self.last_refresh >= REFRESH_FRAMES:
+            self.last_refresh = self.profiler.frames
+            self.refresh(enemies, bullets, particles, quality)
+        arcade.draw_lbwh_rectangle_filled(
+            self.left, self.top - self.height, PANEL_WIDTH, self.height,
+            (0, 0, 0, 180)
+        )
+        self.batch.draw()
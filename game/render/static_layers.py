@@ -0,0 +1,72 @@
+from arcade.gl import geometry
+
+# Неизменные за матч слои (фон, декорации, стены) рисуются один раз
+# в текстуру вне экрана, а дальше каждый кадр выводятся одним квадратом.
+# Кэш сбрасывается только при смене карты или размера окна.
+
+VERTEX_SHADER = """
+#version 330
+
+in vec2 in_vert;
+in vec2 in_uv;
+
+out vec2 v_uv;
+
+void main() {
+    v_uv = in_uv;
+    gl_Position = vec4(in_vert, 0.0, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330
+
+uniform sampler2D layer;
+
+in vec2 v_uv;
+
+out vec4 fragColor;
+
+void main() {
+    fragColor = texture(layer, v_uv);
+}
+"""
+
+
+class StaticLayerCache:
+    def __init__(self, window):
+        self.window = window
+        self.ctx = window.ctx
+        self.program = self.ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
+        self.quad = geometry.quad_2d_fs()
+        self.layers = {}
+        self.size = None
+        self.rebuilds = 0
+
+    def invalidate(self):
+        self.layers.clear()
+
+    def prepare(self, name, paint):
+        # paint() рисует слой обычными средствами arcade, вызывается только при пересборке
+        size = self.window.get_framebuffer_size()
+        if size != self.size:
+            self.invalidate()
+            self.size = size
+        framebuffer = self.layers.get(name)
+        if framebuffer is None:
+            texture = self.ctx.texture(size, components=4)
+            framebuffer = self.ctx.framebuffer(color_attachments=[texture])
+            with framebuffer.activate():
+                framebuffer.clear(color=(0, 0, 0, 0))
+                paint()
+            self.layers[name] = framebuffer
+            self.rebuilds += 1
+        return framebuffer
+
+    def draw(self, name, paint):
+        framebuffer = self.prepare(name, paint)
+        framebuffer.color_attachments[0].use(0)
+        # прозрачные участки слоя должны пропускать то, что нарисовано под ним
+        with self.ctx.enabled(self.ctx.BLEND):
+            self.ctx.blend_func = self.ctx.BLEND_DEFAULT
+            self.quad.render(self.program)
@@ -0,0 +1,304 @@
+# Запись и проигрывание матчей.
+# Файл: заголовок (сид, частота тиков, скин, оружие, карта), затем ввод
+# по тикам отрезками одинакового ввода, затем хэши состояния каждые
+# HASH_INTERVAL тиков. Числа - varint, сдвиги мыши - дельты в zigzag.
+# Проигрывание без окна: python -m replay replays/<файл>.rpl
+import argparse
+import hashlib
+import os
+import random
+import struct
+import time
+
+from data import PlayerSkin, Weapon
+from simulation import InputState, MapData, Simulation
+
+MAGIC = b"ARPL"
+# растёт и при смене формата, и при смене правил симуляции, после
+# которой старые записи уже не повторяются (2 - сплошные столкновения пуль,
+# 3 - расталкивание врагов парами, 4 - стены на NumPy,
+# 5 - расталкивание частями через тик)
+VERSION = 5
+HASH_INTERVAL = 60
+REPLAY_DIR = "replays"
+
+# биты байта ввода
+UP, DOWN, LEFT, RIGHT, FIRE, AIM = 1, 2, 4, 8, 16, 32
+# заголовок: после записи матч менялся чит-клавишами, хэши могут не сойтись
+TAINTED = 1
+
+
+def write_varint(out, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def write_str(out, text):
+    raw = text.encode("utf-8")
+    write_varint(out, len(raw))
+    out += raw
+
+
+def read_str(data, pos):
+    size, pos = read_varint(data, pos)
+    return data[pos:pos + size].decode("utf-8"), pos + size
+
+
+def write_floats(out, *values):
+    out += struct.pack(f"<{len(values)}d", *values)
+
+
+def read_floats(data, pos, count):
+    return struct.unpack_from(f"<{count}d", data, pos), pos + 8 * count
+
+
+def state_hash(sim):
+    # позиции, здоровье и счёт; порядок врагов и пуль в хранилищах
+    # детерминирован, поэтому массивы хэшируются как есть
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(struct.pack(
+        "<q3d3q", sim.ticks, sim.player_x, sim.player_y, sim.game_time,
+        sim.player_health, sim.score, sim.total_kills,
+    ))
+    for store, names in ((sim.enemies, ("x", "y", "health")), (sim.bullets, ("x", "y"))):
+        n = store.count
+        for name in names:
+            digest.update(getattr(store, name)[:n].tobytes())
+    return digest.digest()
+
+
+def encode_input(inp):
+    flags = 0
+    if inp.up:
+        flags |= UP
+    if inp.down:
+        flags |= DOWN
+    if inp.left:
+        flags |= LEFT
+    if inp.right:
+        flags |= RIGHT
+    if inp.fire:
+        flags |= FIRE
+    return flags, int(inp.aim_x), int(inp.aim_y)
+
+
+class ReplayRecorder:
+    def __init__(self, seed, tick_rate, skin, weapon, game_map, width, height):
+        self.header = bytearray(MAGIC)
+        self.header.append(VERSION)
+        write_varint(self.header, seed)
+        write_varint(self.header, tick_rate)
+        write_varint(self.header, width)
+        write_varint(self.header, height)
+        write_str(self.header, skin.name)
+        write_varint(self.header, skin.max_health)
+        write_floats(self.header, skin.speed)
+        write_str(self.header, weapon.name)
+        write_varint(self.header, weapon.damage)
+        write_floats(self.header, weapon.fire_rate)
+        write_varint(self.header, game_map.tile_size)
+        write_varint(self.header, len(game_map.walls))
+        for wall in game_map.walls:
+            write_floats(self.header, *wall)
+        write_varint(self.header, len(game_map.spawn_points))
+        for point in game_map.spawn_points:
+            write_floats(self.header, *point)
+
+        self.inputs = bytearray()
+        self.hashes = []
+        self.ticks = 0
+        self.flags = 0
+        self.tainted = False
+        # текущий отрезок одинакового ввода
+        self.run = None
+        self.run_length = 0
+        self.aim = (0, 0)
+
+    def record(self, inp):
+        # квантованный ввод - его и надо отдавать симуляции, чтобы матч повторился
+        flags, aim_x, aim_y = encode_input(inp)
+        inp.aim_x, inp.aim_y = aim_x, aim_y
+        key = (flags, aim_x, aim_y)
+        if key == self.run:
+            self.run_length += 1
+        else:
+            self.flush_run()
+            self.run = key
+            self.run_length = 1
+        self.ticks += 1
+
+    def flush_run(self):
+        if self.run is None:
+            return
+        flags, aim_x, aim_y = self.run
+        if (aim_x, aim_y) != self.aim:
+            flags |= AIM
+        write_varint(self.inputs, self.run_length)
+        self.inputs.append(flags)
+        if flags & AIM:
+            write_varint(self.inputs, zigzag(aim_x - self.aim[0]))
+            write_varint(self.inputs, zigzag(aim_y - self.aim[1]))
+            self.aim = (aim_x, aim_y)
+        self.run = None
+
+    def check(self, sim):
+        if sim.ticks % HASH_INTERVAL == 0:
+            self.hashes.append(state_hash(sim))
+
+    def to_bytes(self):
+        self.flush_run()
+        out = bytearray(self.header)
+        out.append(TAINTED if self.tainted else 0)
+        write_varint(out, HASH_INTERVAL)
+        write_varint(out, self.ticks)
+        write_varint(out, len(self.inputs))
+        out += self.inputs
+        write_varint(out, len(self.hashes))
+        for digest in self.hashes:
+            out += digest
+        return bytes(out)
+
+    def save(self, path=None):
+        if path is None:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            path = os.path.join(REPLAY_DIR, time.strftime("%Y%m%d_%H%M%S") + ".rpl")
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+        return path
+
+
+class Replay:
+    def __init__(self, data):
+        if data[:4] != MAGIC or data[4] != VERSION:
+            raise ValueError("Это не файл повтора или версия не поддерживается")
+        pos = 5
+        self.seed, pos = read_varint(data, pos)
+        self.tick_rate, pos = read_varint(data, pos)
+        self.width, pos = read_varint(data, pos)
+        self.height, pos = read_varint(data, pos)
+        name, pos = read_str(data, pos)
+        max_health, pos = read_varint(data, pos)
+        (speed,), pos = read_floats(data, pos, 1)
+        self.skin = PlayerSkin(name=name, max_health=max_health, speed=speed)
+        name, pos = read_str(data, pos)
+        damage, pos = read_varint(data, pos)
+        (fire_rate,), pos = read_floats(data, pos, 1)
+        self.weapon = Weapon(name=name, damage=damage, fire_rate=fire_rate)
+        tile_size, pos = read_varint(data, pos)
+        count, pos = read_varint(data, pos)
+        walls = []
+        for _ in range(count):
+            wall, pos = read_floats(data, pos, 4)
+            walls.append(wall)
+        count, pos = read_varint(data, pos)
+        spawn_points = []
+        for _ in range(count):
+            point, pos = read_floats(data, pos, 2)
+            spawn_points.append(point)
+        self.game_map = MapData(walls=walls, spawn_points=spawn_points, tile_size=tile_size)
+
+        self.tainted = bool(data[pos] & TAINTED)
+        pos += 1
+        self.hash_interval, pos = read_varint(data, pos)
+        self.ticks, pos = read_varint(data, pos)
+        size, pos = read_varint(data, pos)
+        self.inputs = data[pos:pos + size]
+        pos += size
+        count, pos = read_varint(data, pos)
+        self.hashes = [data[pos + 8 * i:pos + 8 * (i + 1)] for i in range(count)]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls(file.read())
+
+    def make_sim(self):
+        return Simulation(
+            self.skin, self.weapon, self.game_map,
+            tick_rate=self.tick_rate, rng=random.Random(self.seed),
+            width=self.width, height=self.height,
+        )
+
+    def frames(self):
+        # InputState на каждый тик; один объект на отрезок одинакового ввода
+        data = self.inputs
+        pos = 0
+        aim_x = aim_y = 0
+        while pos < len(data):
+            length, pos = read_varint(data, pos)
+            flags = data[pos]
+            pos += 1
+            if flags & AIM:
+                delta, pos = read_varint(data, pos)
+                aim_x += unzigzag(delta)
+                delta, pos = read_varint(data, pos)
+                aim_y += unzigzag(delta)
+            inp = InputState(
+                up=bool(flags & UP), down=bool(flags & DOWN),
+                left=bool(flags & LEFT), right=bool(flags & RIGHT),
+                aim_x=aim_x, aim_y=aim_y, fire=bool(flags & FIRE),
+            )
+            for _ in range(length):
+                yield inp
+
+
+def play(replay, sim=None):
+    # прогон без окна на максимальной скорости;
+    # возвращает (тиков, секунд, номер первого несовпавшего хэша или None)
+    sim = sim or replay.make_sim()
+    mismatch = None
+    checked = 0
+    start = time.perf_counter()
+    for inp in replay.frames():
+        sim.step(inp)
+        if sim.ticks % replay.hash_interval == 0 and checked < len(replay.hashes):
+            if mismatch is None and state_hash(sim) != replay.hashes[checked]:
+                mismatch = sim.ticks
+            checked += 1
+    return sim.ticks, time.perf_counter() - start, mismatch
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.path)
+    ticks, seconds, mismatch = play(replay)
+    print(f"Тиков: {ticks} за {seconds:.3f} с ({ticks / max(seconds, 1e-9):.0f} тиков/с)")
+    if mismatch is None:
+        print("Хэши состояния совпали")
+    else:
+        print(f"Расхождение состояния на тике {mismatch}")
+        if replay.tainted:
+            print("В матче использовались чит-клавиши, расхождение ожидаемо")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+import math
+import random
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from data import PlayerSkin, Weapon
+from entities import BulletStore, EnemyStore
+from pathfinding import FlowField
+from profiler import FrameProfiler
+from spatial import CellList, WallGrid, sweep_circles
+
+# Игровая логика без arcade: её можно гонять без окна
+# (боты, CI, балансировка), а GameView только рисует и передаёт ввод.
+
+ARENA_WIDTH = 1200
+ARENA_HEIGHT = 800
+
+# Скорости и интервалы заданы в кадрах по 1/60 с, как было при привязке к кадрам
+BASE_FPS = 60
+ENEMY_SPEED = 2
+BULLET_SPEED = 10
+ENEMY_SPAWN_RATE = 60
+CONTACT_DAMAGE = 5
+PLAYER_RADIUS = 25
+# оружие без пуль: выстрел сразу проверяется лучом до первой стены или врага
+HITSCAN_WEAPONS = ("Снайперка",)
+
+# расталкивание врагов: доля перекрытия, снимаемая за кадр,
+# и сколько кандидатов в соседи каждый враг берёт из одной ячейки
+SEPARATION_STRENGTH = 0.25
+SEPARATION_PER_CELL = 8
+# расталкивание идёт частями: за тик - одна часть пар с силой, умноженной на
+# число частей, каждая пара толкается раз в SEPARATION_PARTS тиков
+SEPARATION_PARTS = 2
+
+TICK_RATE = 60
+
+
+@dataclass
+class InputState:
+    up: bool = False
+    down: bool = False
+    left: bool = False
+    right: bool = False
+    aim_x: float = 0
+    aim_y: float = 0
+    fire: bool = False
+
+
+@dataclass
+class MapData:
+    # стены - (center_x, center_y, half_width, half_height)
+    walls: List[Tuple[float, float, float, float]] = field(default_factory=list)
+    spawn_points: List[Tuple[float, float]] = field(default_factory=list)
+    tile_size: int = 64
+    # готовая карта занятости тайлов из кэша карт, иначе считается по стенам
+    solid: Optional[bytes] = None
+
+
+def default_map(rng, width=ARENA_WIDTH, height=ARENA_HEIGHT, tile_size=64):
+    half = tile_size / 2
+    map_width = width // tile_size
+    map_height = height // tile_size
+    walls = []
+    for x in range(map_width):
+        walls.append((x * tile_size + tile_size//2, tile_size//2, half, half))
+        walls.append((x * tile_size + tile_size//2, height - tile_size//2, half, half))
+
+    for y in range(map_height):
+        walls.append((tile_size//2, y * tile_size + tile_size//2, half, half))
+        walls.append((width - tile_size//2, y * tile_size + tile_size//2, half, half))
+
+    for _ in range(10):
+        x = rng.randint(2, map_width - 3) * tile_size + tile_size//2
+        y = rng.randint(2, map_height - 3) * tile_size + tile_size//2
+        walls.append((x, y, half, half))
+
+    spawn_points = []
+    for i in range(5):
+        spawn_points.append((rng.randint(100, width-100), height-100))
+        spawn_points.append((rng.randint(100, width-100), 100))
+        spawn_points.append((100, rng.randint(100, height-100)))
+        spawn_points.append((width-100, rng.randint(100, height-100)))
+
+    return MapData(walls=walls, spawn_points=spawn_points, tile_size=tile_size)
+
+
+class Simulation:
+    def __init__(self, skin: PlayerSkin, weapon: Weapon, game_map: MapData,
+                 tick_rate=TICK_RATE, rng=None,
+                 width=ARENA_WIDTH, height=ARENA_HEIGHT):
+        self.skin = skin
+        self.weapon = weapon
+        self.rng = rng or random.Random()
+        self.width = width
+        self.height = height
+
+        self.wall_grid = WallGrid(game_map.walls, game_map.tile_size, game_map.solid)
+        self.spawn_points = list(game_map.spawn_points)
+        # враги обходят стены по общему полю направлений от тайла игрока
+        self.flow_field = FlowField(self.wall_grid) if self.wall_grid else None
+
+        self.player_health = skin.max_health
+        self.player_max_health = skin.max_health
+        self.player_speed = skin.speed
+        self.player_x = width // 2
+        self.player_y = height // 2
+        self.player_radius = PLAYER_RADIUS
+        self.prev_player_x = self.player_x
+        self.prev_player_y = self.player_y
+
+        self.bullets = BulletStore()
+        self.enemies = EnemyStore()
+        self.hit_cells = CellList()
+        self.crowd_cells = CellList()
+        # попадания лучом за тик, урон по ним считается в check_collisions
+        self.ray_hits = []
+        self.enemy_spawn_timer = 0
+        self.shoot_cooldown = 0
+        self.score = 0
+        self.total_kills = 0
+        self.game_time = 0
+        self.ticks = 0
+        self.game_over = False
+        # события последнего тика для звука и эффектов: (тип, x, y)
+        self.events = []
+
+        # по умолчанию выключен; GameView и бенчмарки подставляют свой
+        self.profiler = FrameProfiler()
+
+        self.tick_dt = 1 / tick_rate
+        # сколько кадров по 1/60 с укладывается в один тик
+        self.step_scale = BASE_FPS / tick_rate
+
+    def step(self, inp: InputState):
+        if self.game_over:
+            return
+        profiler = self.profiler
+        profiler.start()
+        self.events.clear()
+        self.prev_player_x = self.player_x
+        self.prev_player_y = self.player_y
+        self.bullets.remember_positions()
+        self.enemies.remember_positions()
+
+        if inp.fire:
+            self.shoot(inp.aim_x, inp.aim_y)
+        self.ticks += 1
+        self.game_time += self.tick_dt
+        if self.shoot_cooldown > 0:
+            self.shoot_cooldown -= self.step_scale
+        self.move_player(inp)
+        profiler.mark("move_player")
+        self.update_bullets()
+        profiler.mark("update_bullets")
+        self.update_enemies()
+        self.spawn_enemies()
+        profiler.mark("spawn_enemies")
+        self.check_collisions()
+        profiler.mark("check_collisions")
+        # отложенное удаление погибших за тик
+        self.bullets.flush()
+        self.enemies.flush()
+        profiler.mark("flush")
+        if self.player_health <= 0:
+            self.game_over = True
+
+    def move_player(self, inp: InputState):
+        dx, dy = 0, 0
+        speed = self.player_speed * self.step_scale
+        if inp.up:
+            dy += speed
+        if inp.down:
+            dy -= speed
+        if inp.left:
+            dx -= speed
+        if inp.right:
+            dx += speed
+
+        if dx != 0 and dy != 0:
+            dx *= 0.7071
+            dy *= 0.7071
+        if self.wall_grid:
+            self.player_x, self.player_y = self.wall_grid.move_box(
+                self.player_x, self.player_y, self.player_radius, dx, dy
+            )
+        else:
+            self.player_x += dx
+            self.player_y += dy
+            self.player_x = max(self.player_radius, min(self.width - self.player_radius, self.player_x))
+            self.player_y = max(self.player_radius, min(self.height - self.player_radius, self.player_y))
+
+    def update_bullets(self):
+        bullets = self.bullets
+        bullets.update()
+        bullets_to_remove = bullets.out_of_bounds(0, 0, self.width, self.height)
+        if self.wall_grid and bullets:
+            # отрезок пути за тик проверяется сразу по всем стенам рядом с ним
+            live = np.flatnonzero(~bullets_to_remove)
+            x0, y0 = bullets.prev_x[live], bullets.prev_y[live]
+            x1, y1 = bullets.x[live], bullets.y[live]
+            t = self.wall_grid.sweep(x0, y0, x1, y1)
+            hit = t <= 1
+            if hit.any():
+                # пуля останавливается у стены и врагов за ней уже не задевает
+                i = live[hit]
+                t = t[hit]
+                bullets.x[i] = x0[hit] + (x1[hit] - x0[hit]) * t
+                bullets.y[i] = y0[hit] + (y1[hit] - y0[hit]) * t
+                bullets_to_remove[i] = True
+        bullets.kill(bullets_to_remove)
+
+    def update_enemies(self):
+        enemies = self.enemies
+        n = enemies.count
+        if self.flow_field is not None and n:
+            self.flow_field.update(self.player_x, self.player_y)
+            target_x, target_y = self.flow_field.targets(
+                enemies.x[:n], enemies.y[:n], self.player_x, self.player_y
+            )
+        else:
+            target_x, target_y = self.player_x, self.player_y
+        enemies.update(target_x, target_y, self.step_scale)
+        self.profiler.mark("update_enemies")
+        self.separate_enemies()
+        self.profiler.mark("separate_enemies")
+        self.push_walls()
+        self.profiler.mark("push_walls")
+
+    def push_walls(self):
+        enemies = self.enemies
+        n = enemies.count
+        if not self.wall_grid or not n:
+            return
+        # у каждого врага - строка стен рядом из таблицы сетки; стены строки
+        # отталкивают по очереди, как раньше в цикле по врагу, но каждый шаг
+        # делается сразу для всех врагов, у которых эта стена есть
+        walls = self.wall_grid.nearby_many(enemies.x[:n], enemies.y[:n], float(enemies.radius[:n].max()))
+        near = np.flatnonzero(walls[:, 0] >= 0)
+        walls = walls[near]
+        x, y = enemies.x[near], enemies.y[near]
+        radius = enemies.radius[near]
+        boxes = self.wall_grid.boxes
+        for column in walls.T:
+            # строки дополнены -1 в конце, так что стен в столбце всё меньше
+            rows = np.flatnonzero(column >= 0)
+            if not len(rows):
+                break
+            wall = boxes[column[rows]]
+            dx = x[rows] - wall[:, 0]
+            dy = y[rows] - wall[:, 1]
+            distance = np.sqrt(dx*dx + dy*dy)
+            touching = distance < radius[rows] + wall[:, 2]
+            rows = rows[touching]
+            dist = np.maximum(0.1, distance[touching])
+            x[rows] += (dx[touching] / dist) * 5 * self.step_scale
+            y[rows] += (dy[touching] / dist) * 5 * self.step_scale
+        enemies.x[near] = x
+        enemies.y[near] = y
+
+    def separate_enemies(self):
+        # враги расталкивают друг друга; соседей ищем по сетке, и каждый враг
+        # берёт не больше 5 * SEPARATION_PER_CELL кандидатов, так что проход
+        # линеен по числу врагов, а за тик из них берётся одна часть из SEPARATION_PARTS
+        enemies = self.enemies
+        n = enemies.count
+        if n < 2:
+            return
+        x, y = enemies.x[:n], enemies.y[:n]
+        radius = enemies.radius[:n]
+        # ячейка - наибольшее расстояние касания, дальше соседи не толкаются
+        reach = 2 * int(radius.max())
+        cells = self.crowd_cells
+        cells.cell_size = reach
+        cells.build(x, y)
+        # координаты в порядке ячеек, пары - места в этом порядке
+        order = cells.order
+        xs, ys = x[order], y[order]
+        radius = radius[order].astype(np.float64)
+
+        # пара расталкивает обоих: враг в толпе сдвигается
+        # и от тех соседей, которых сам не выбирал
+        first, second = cells.pairs(SEPARATION_PER_CELL, self.ticks % SEPARATION_PARTS, SEPARATION_PARTS)
+        dx = xs[first] - xs[second]
+        dy = ys[first] - ys[second]
+        squared = dx*dx + dy*dy
+        # дальние пары отсеиваются одним сравнением, остальное - только для ближних
+        close = np.flatnonzero(squared < reach * reach)
+        first = first[close]
+        second = second[close]
+        distance = np.sqrt(squared[close])
+        overlap = radius[first] + radius[second] - distance
+        touching = np.flatnonzero(overlap > 0)
+        if not len(touching):
+            return
+        first = first[touching]
+        second = second[touching]
+        dx = dx[close[touching]]
+        dy = dy[close[touching]]
+        distance = distance[touching]
+        overlap = overlap[touching]
+        # совпавшие центры разводим в стороны по номеру врага
+        same = distance < 1e-6
+        if same.any():
+            dx[same] = np.cos(order[first[same]])
+            dy[same] = np.sin(order[first[same]])
+            distance[same] = 1.0
+        # каждый из пары уходит на свою половину перекрытия
+        strength = min(1.0, SEPARATION_STRENGTH * SEPARATION_PARTS * self.step_scale)
+        share = overlap / (2 * distance) * strength
+        push_x = np.bincount(first, dx * share, n) - np.bincount(second, dx * share, n)
+        push_y = np.bincount(first, dy * share, n) - np.bincount(second, dy * share, n)
+        x[order] += push_x
+        y[order] += push_y
+
+    def spawn_enemies(self):
+        self.enemy_spawn_timer += self.step_scale
+        if self.enemy_spawn_timer >= ENEMY_SPAWN_RATE and self.spawn_points:
+            self.enemy_spawn_timer = 0
+            self.spawn_enemy()
+
+    def spawn_enemy(self):
+        x, y = self.rng.choice(self.spawn_points)
+        health = 30 + int(self.game_time) // 10
+        self.enemies.add(
+            x=x,
+            y=y,
+            health=health,
+            max_health=health,
+            speed=ENEMY_SPEED + self.rng.uniform(-0.5, 0.5),
+            radius=20 + self.rng.randint(-5, 5)
+        )
+
+    def check_collisions(self):
+        enemies = self.enemies
+        bullets = self.bullets
+        n = enemies.count
+        m = bullets.count
+        hit_bullets = np.zeros(0, dtype=np.int64)
+        hit_enemies = self.ray_hits
+        self.ray_hits = []
+        if n and m:
+            # каждая пуля проверяется по всему отрезку, пройденному за тик,
+            # так что быстрая пуля не проскакивает врага; пули, упёршиеся в стену
+            # или вылетевшие за край в этом тике, ещё могут задеть врага до этого
+            x0, y0 = bullets.prev_x[:m], bullets.prev_y[:m]
+            dx = bullets.x[:m] - x0
+            dy = bullets.y[:m] - y0
+            a = dx*dx + dy*dy
+
+            # широкая фаза: враги сортируются по ячейкам, пуля берёт врагов
+            # из 3x3 ячеек вокруг середины отрезка. Ячейка не меньше досягаемости:
+            # полотрезка и оба радиуса
+            reach = np.sqrt(a.max()) / 2 + bullets.radius[:m].max() + enemies.radius[:n].max()
+            cells = self.hit_cells
+            cells.cell_size = max(1, math.ceil(reach))
+            cells.build(enemies.x[:n], enemies.y[:n])
+            i, j = cells.neighbours(x0 + dx / 2, y0 + dy / 2)
+
+            # доля пути до входа в круг для всех пар сразу, как в sweep_circles;
+            # у неподвижной пули b = 0, так что на a = 0 она не делится
+            fx = x0[i] - enemies.x[j]
+            fy = y0[i] - enemies.y[j]
+            radius = bullets.radius[i] + enemies.radius[j]
+            c = fx*fx + fy*fy - radius*radius
+            b = fx*dx[i] + fy*dy[i]
+            disc = b*b - a[i]*c
+            t = np.where(c < 0, 0.0, np.inf)
+            crossing = np.flatnonzero((c >= 0) & (b < 0) & (disc > 0))
+            entry = (-b[crossing] - np.sqrt(disc[crossing])) / a[i[crossing]]
+            t[crossing] = np.where(entry <= 1, entry, np.inf)
+
+            # пуля попадает в первого врага на своём пути, при равенстве - в первого
+            # по списку. Пары идут подряд по пулям, поэтому минимум берётся по группам
+            hit = np.flatnonzero(np.isfinite(t))
+            if len(hit):
+                i, j, t = i[hit], j[hit], t[hit]
+                first = np.ones(len(i), dtype=bool)
+                first[1:] = i[1:] != i[:-1]
+                groups = np.flatnonzero(first)
+                group = np.cumsum(first) - 1
+                hit_bullets = i[groups]
+                hit_t = np.minimum.reduceat(t, groups)
+                earliest = np.where(t == hit_t[group], j, n)
+                hit_enemies += np.minimum.reduceat(earliest, groups).tolist()
+                hit_x = x0[hit_bullets] + dx[hit_bullets] * hit_t
+                hit_y = y0[hit_bullets] + dy[hit_bullets] * hit_t
+                self.events.extend(("hit", x, y) for x, y in zip(hit_x.tolist(), hit_y.tolist()))
+
+        killed = enemies.damage(hit_enemies, self.weapon.damage)
+        kills = int(killed.sum())
+        self.score += 10 * kills
+        self.total_kills += kills
+        killed_x = enemies.x[:n][killed].tolist()
+        killed_y = enemies.y[:n][killed].tolist()
+        self.events.extend(("kill", x, y) for x, y in zip(killed_x, killed_y))
+
+        # касание игрока считается сразу для всех врагов
+        dx = enemies.x[:n] - self.player_x
+        dy = enemies.y[:n] - self.player_y
+        distance = np.sqrt(dx*dx + dy*dy)
+        touching = (distance < self.player_radius + enemies.radius[:n]) & ~killed & enemies.alive
+        touches = int(touching.sum())
+        if touches:
+            self.player_health -= CONTACT_DAMAGE * touches
+            dist = np.maximum(0.1, distance[touching])
+            enemies.x[:n][touching] += (dx[touching] / dist) * 20
+            enemies.y[:n][touching] += (dy[touching] / dist) * 20
+
+        enemies.kill(killed)
+        bullets.kill(hit_bullets)
+
+    def shoot(self, aim_x, aim_y):
+        if self.shoot_cooldown > 0:
+            return False
+
+        self.shoot_cooldown = int(self.weapon.fire_rate * BASE_FPS)
+        dx = aim_x - self.player_x
+        dy = aim_y - self.player_y
+        dist = max(0.1, math.sqrt(dx*dx + dy*dy))
+        self.events.append(("shot", self.player_x, self.player_y))
+        if self.weapon.name in HITSCAN_WEAPONS:
+            self.fire_ray(dx / dist, dy / dist)
+            return True
+        self.bullets.add(
+            x=self.player_x,
+            y=self.player_y,
+            dx=(dx / dist) * BULLET_SPEED * self.step_scale,
+            dy=(dy / dist) * BULLET_SPEED * self.step_scale,
+            damage=self.weapon.damage
+        )
+        return True
+
+    def fire_ray(self, ux, uy):
+        # луч через всю арену: обход тайлов до первой стены, затем
+        # ближайший на луче враг до неё; событие ray - точка, где луч оборвался
+        x0, y0 = self.player_x, self.player_y
+        length = math.hypot(self.width, self.height)
+        dx, dy = ux * length, uy * length
+        t_end = 1.0
+        if self.wall_grid:
+            t = self.wall_grid.raycast(x0, y0, x0 + dx, y0 + dy)
+            if t is not None:
+                t_end = t
+
+        enemies = self.enemies
+        n = enemies.count
+        if n:
+            t = sweep_circles(x0, y0, dx, dy, enemies.x[:n], enemies.y[:n], enemies.radius[:n])
+            t[~enemies.alive] = np.inf
+            j = int(np.argmin(t))
+            if t[j] < t_end:
+                t_end = float(t[j])
+                self.ray_hits.append(j)
+                self.events.append(("hit", x0 + dx * t_end, y0 + dy * t_end))
+        self.events.append(("ray", x0 + dx * t_end, y0 + dy * t_end))
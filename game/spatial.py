@@ -0,0 +1,422 @@
+import math
+
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Размер ячейки должен быть не меньше типичной дистанции запроса,
+# тогда запрос затрагивает не больше 3x3 ячеек
+CELL_SIZE = 64
+
+
+def segment_box(x0: float, y0: float, dx: float, dy: float,
+                cx: float, cy: float, half_width: float, half_height: float) -> Optional[float]:
+    # то же для прямоугольника (метод плит): доля отрезка до входа или None
+    t_in, t_out = 0.0, 1.0
+    for start, delta, low, high in (
+        (x0, dx, cx - half_width, cx + half_width),
+        (y0, dy, cy - half_height, cy + half_height),
+    ):
+        if delta == 0:
+            if start < low or start > high:
+                return None
+            continue
+        a = (low - start) / delta
+        b = (high - start) / delta
+        if a > b:
+            a, b = b, a
+        t_in = max(t_in, a)
+        t_out = min(t_out, b)
+        if t_in > t_out:
+            return None
+    return t_in
+
+
+def segment_boxes(x0, y0, dx, dy, cx, cy, half_width, half_height):
+    # segment_box для массивов: отрезки и прямоугольники сопоставляются
+    # по правилам broadcasting, промах - inf
+    t_in = 0.0
+    t_out = 1.0
+    for start, delta, low, high in (
+        (x0, dx, cx - half_width, cx + half_width),
+        (y0, dy, cy - half_height, cy + half_height),
+    ):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a = (low - start) / delta
+            b = (high - start) / delta
+        # отрезок вдоль оси: внутри плиты она не ограничивает, снаружи - промах
+        still = delta == 0
+        inside = (start >= low) & (start <= high)
+        a = np.where(still, np.where(inside, -np.inf, np.inf), a)
+        b = np.where(still, np.inf, b)
+        t_in = np.maximum(t_in, np.minimum(a, b))
+        t_out = np.minimum(t_out, np.maximum(a, b))
+    return np.where(t_in <= t_out, t_in, np.inf)
+
+
+def sweep_circles(x0: float, y0: float, dx: float, dy: float, cx, cy, radius):
+    # для каждого круга - доля отрезка (x0, y0) + t * (dx, dy), t в [0, 1],
+    # на которой точка входит в круг; 0 - если уже внутри, inf - если не входит
+    fx = x0 - cx
+    fy = y0 - cy
+    c = fx*fx + fy*fy - radius*radius
+    a = dx*dx + dy*dy
+    b = fx*dx + fy*dy
+    disc = b*b - a*c
+    t = np.full(len(c), np.inf)
+    crossing = (b < 0) & (disc > 0)
+    if a:
+        t[crossing] = (-b[crossing] - np.sqrt(disc[crossing])) / a
+    t[t > 1] = np.inf
+    t[c < 0] = 0.0
+    return t
+
+
+# Равномерная сетка для широкой фазы столкновений.
+# Пересобирается каждый тик: clear() и insert() для всех объектов,
+# затем query() отдаёт только объекты из соседних ячеек.
+class SpatialHash:
+    def __init__(self, cell_size: int = CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List] = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, item, x: float, y: float):
+        key = (int(x // self.cell_size), int(y // self.cell_size))
+        cell = self.cells.get(key)
+        if cell is None:
+            self.cells[key] = [item]
+        else:
+            cell.append(item)
+
+    def query(self, x: float, y: float, reach: float) -> Iterator:
+        # все объекты, центр которых может лежать ближе reach к точке (x, y)
+        size = self.cell_size
+        cells = self.cells
+        x0, x1 = int((x - reach) // size), int((x + reach) // size)
+        y0, y1 = int((y - reach) // size), int((y + reach) // size)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    yield from cell
+
+    def __len__(self):
+        return sum(len(cell) for cell in self.cells.values())
+
+
+# Сетка для массивов координат целиком на NumPy: индексы отсортированы
+# по ячейкам, start и counts задают отрезок каждой ячейки в order.
+# Вокруг занятой области оставлен пустой ряд ячеек, поэтому соседняя
+# ячейка любого объекта всегда существует.
+class CellList:
+    def __init__(self, cell_size: int = CELL_SIZE):
+        self.cell_size = cell_size
+        self.width = 0
+        self.height = 0
+        self.first_col = 0
+        self.first_row = 0
+        self.keys = None
+        self.order = None
+        self.start = None
+        self.counts = None
+
+    def build(self, xs, ys):
+        cols = (xs // self.cell_size).astype(np.int64)
+        rows = (ys // self.cell_size).astype(np.int64)
+        self.first_col = int(cols.min()) - 1
+        self.first_row = int(rows.min()) - 1
+        cols -= self.first_col
+        rows -= self.first_row
+        self.width = int(cols.max()) + 2
+        self.height = int(rows.max()) + 2
+        self.keys = rows * self.width + cols
+        # до 65536 ячеек ключи сортируются как uint16: для них устойчивая
+        # сортировка NumPy - поразрядная, на порядок быстрее, порядок тот же
+        small = self.width * self.height <= 1 << 16
+        order = np.argsort(self.keys.astype(np.uint16) if small else self.keys, kind="stable")
+        self.order = order
+        self.counts = np.bincount(self.keys, minlength=self.width * self.height)
+        self.start = np.cumsum(self.counts) - self.counts
+
+    def offsets(self):
+        # сдвиги ключа на соседние ячейки 3x3, своя ячейка первой
+        width = self.width
+        return np.array([0, -width - 1, -width, -width + 1, -1, 1, width - 1, width, width + 1])
+
+    def neighbours(self, xs, ys):
+        # пары (точка, объект): для каждой из точек xs, ys - все объекты
+        # из 3x3 ячеек вокруг неё. Точки за краем прижимаются к сетке,
+        # лишние пары с дальними объектами отсеет точная проверка
+        cols = np.clip((xs // self.cell_size).astype(np.int64) - self.first_col, 1, self.width - 2)
+        rows = np.clip((ys // self.cell_size).astype(np.int64) - self.first_row, 1, self.height - 2)
+        keys = ((rows * self.width + cols)[:, None] + self.offsets()).ravel()
+        group, place = spans(self.counts[keys])
+        return group // 9, self.order[self.start[keys][group] + place]
+
+    def pairs(self, per_cell: int, part: int = 0, parts: int = 1):
+        # пары кандидатов в соседи (first, second), каждая не больше одного раза,
+        # как места в order: у соседей по ячейке они рядом, и массивы,
+        # переставленные по order, читаются подряд, а не вразброс.
+        # В своей ячейке объект берёт до per_cell следующих за ним по месту
+        # (по кругу), в каждой из четырёх соседних "вперёд" - окно из per_cell
+        # объектов, сдвинутое по его месту, так что в толпе окна разных
+        # объектов не совпадают и вместе перебирают ячейку целиком.
+        # Цикл - по шагам окна, не больше per_cell: на каждом шаге все объекты,
+        # у которых ещё есть кандидат, сразу, и массивы сжимаются по мере того,
+        # как малые ячейки кончаются.
+        # parts > 1 делит пары на части по строкам ячеек: пару строит только
+        # ячейка со строкой row % parts == part, так что части не пересекаются
+        counts, start = self.counts, self.start
+        keys = self.keys[self.order]
+        rank = np.arange(len(keys)) - start[keys]
+        mine = keys // self.width % parts == part if parts > 1 else True
+        first, second = [], []
+
+        # своя ячейка: больше size // 2 шагов вперёд - это уже пары с другой стороны
+        size = counts[keys]
+        slots = np.flatnonzero((size > 1) & mine)
+        size, place, base = size[slots], rank[slots], start[keys[slots]]
+        for step in range(1, per_cell + 1):
+            keep = np.flatnonzero(2 * step <= size)
+            if not len(keep):
+                break
+            if len(keep) < len(slots):
+                slots, size, place, base = slots[keep], size[keep], place[keep], base[keep]
+            # пара ровно через полкруга видна с обеих сторон, берётся с первой
+            valid = np.flatnonzero((2 * step < size) | (2 * place < size))
+            other = place[valid] + step
+            other -= np.where(other >= size[valid], size[valid], 0)
+            first.append(slots[valid])
+            second.append(base[valid] + other)
+
+        for offset in (1, self.width - 1, self.width, self.width + 1):
+            near = keys + offset
+            size = counts[near]
+            slots = np.flatnonzero((size > 0) & mine)
+            size, base = size[slots], start[near[slots]]
+            # окно сдвигается только в ячейках больше окна, меньшие берутся целиком
+            shift = np.where(size > per_cell, rank[slots] * per_cell % size, 0)
+            for step in range(per_cell):
+                if step:
+                    keep = np.flatnonzero(size > step)
+                    if not len(keep):
+                        break
+                    if len(keep) < len(slots):
+                        slots, size, base, shift = slots[keep], size[keep], base[keep], shift[keep]
+                other = shift + step
+                other -= np.where(other >= size, size, 0)
+                first.append(slots)
+                second.append(base + other)
+        return np.concatenate(first), np.concatenate(second)
+
+
+def spans(sizes):
+    # развёртка отрезков длины sizes: для каждого элемента - номер отрезка
+    # и место внутри него
+    group = np.repeat(np.arange(len(sizes)), sizes)
+    ends = np.cumsum(sizes)
+    place = np.arange(len(group)) - (ends - sizes)[group]
+    return group, place
+
+
+# Статическая сетка стен, строится один раз при загрузке карты.
+# Стена описывается кортежем (center_x, center_y, half_width, half_height).
+# solid - карта занятости тайлов, cells - стены по ячейкам их центров,
+# поэтому любой запрос к стенам стоит O(1) независимо от размера карты.
+class WallGrid:
+    def __init__(self, walls, cell_size: int = CELL_SIZE, solid=None):
+        self.cell_size = cell_size
+        self.walls = list(walls)
+        self.cells = SpatialHash(cell_size)
+        self.max_half = 0
+
+        if self.walls:
+            self.left = min(x - hw for x, y, hw, hh in self.walls)
+            self.bottom = min(y - hh for x, y, hw, hh in self.walls)
+            right = max(x + hw for x, y, hw, hh in self.walls)
+            top = max(y + hh for x, y, hw, hh in self.walls)
+        else:
+            self.left = self.bottom = right = top = 0
+        self.left = (self.left // cell_size) * cell_size
+        self.bottom = (self.bottom // cell_size) * cell_size
+        self.cols = max(1, math.ceil((right - self.left) / cell_size))
+        self.rows = max(1, math.ceil((top - self.bottom) / cell_size))
+        # занятость тайлов можно передать готовой, если она считалась по тем же стенам
+        precomputed = solid is not None and len(solid) == self.cols * self.rows
+        self.solid = bytearray(solid) if precomputed else bytearray(self.cols * self.rows)
+        # стены массивом для векторных проверок: строка - (x, y, hw, hh)
+        self.boxes = np.array(self.walls, dtype=np.float64).reshape(-1, 4)
+        # номера стен по ячейкам их центров, как в cells
+        self._cell_walls = SpatialHash(cell_size)
+        self._tables = {}
+
+        for index, wall in enumerate(self.walls):
+            x, y, hw, hh = wall
+            self.cells.insert(wall, x, y)
+            self._cell_walls.insert(index, x, y)
+            self.max_half = max(self.max_half, hw, hh)
+            if precomputed:
+                continue
+            col0, row0 = self.tile_of(x - hw, y - hh)
+            col1, row1 = self.tile_of(x + hw, y + hh)
+            # касание границей соседний тайл не занимает
+            if self.left + col1 * cell_size == x + hw:
+                col1 -= 1
+            if self.bottom + row1 * cell_size == y + hh:
+                row1 -= 1
+            for row in range(max(0, row0), min(self.rows - 1, row1) + 1):
+                for col in range(max(0, col0), min(self.cols - 1, col1) + 1):
+                    self.solid[row * self.cols + col] = 1
+
+    def __bool__(self):
+        return bool(self.walls)
+
+    def tile_of(self, x: float, y: float) -> Tuple[int, int]:
+        return (
+            int((x - self.left) // self.cell_size),
+            int((y - self.bottom) // self.cell_size),
+        )
+
+    def is_solid(self, col: int, row: int) -> bool:
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return self.solid[row * self.cols + col] == 1
+        return False
+
+    def wall_table(self, k: int):
+        # для каждой ячейки сетки с полем в k ячеек - номера стен из квадрата
+        # (2k+1)x(2k+1) ячеек вокруг неё в порядке query(), строки дополнены -1.
+        # Строится один раз на k: стены не двигаются
+        table = self._tables.get(k)
+        if table is not None:
+            return table
+        first_col = int(self.left // self.cell_size) - k
+        first_row = int(self.bottom // self.cell_size) - k
+        width = self.cols + 2 * k
+        height = self.rows + 2 * k
+        # ячейка стены минус сдвиг - ячейка, в чью строку она попадает;
+        # сдвиги по x, затем по y дают тот же порядок, что обход ячеек в query()
+        rows = [[] for _ in range(width * height)]
+        cells = [
+            ((cx - first_col, cy - first_row), walls)
+            for (cx, cy), walls in self._cell_walls.cells.items()
+        ]
+        for ox in range(-k, k + 1):
+            for oy in range(-k, k + 1):
+                for (col, row), walls in cells:
+                    col -= ox
+                    row -= oy
+                    if 0 <= col < width and 0 <= row < height:
+                        rows[row * width + col].extend(walls)
+        table = np.full((width * height, max(1, max(map(len, rows)))), -1, dtype=np.int64)
+        for index, walls in enumerate(rows):
+            table[index, :len(walls)] = walls
+        self._tables[k] = table
+        return table
+
+    def nearby_many(self, xs, ys, radius: float):
+        # nearby() для массивов точек: по строке номеров стен на точку, -1 - пусто.
+        # Непустые номера идут подряд с начала строки, поэтому точки
+        # без стен рядом отсеиваются по первому столбцу
+        k = max(1, math.ceil((radius + self.max_half) / self.cell_size))
+        table = self.wall_table(k)
+        width = self.cols + 2 * k
+        first_col = int(self.left // self.cell_size) - k
+        first_row = int(self.bottom // self.cell_size) - k
+        cols = np.clip((xs // self.cell_size).astype(np.int64) - first_col, 0, width - 1)
+        rows = np.clip((ys // self.cell_size).astype(np.int64) - first_row, 0, self.rows + 2 * k - 1)
+        return table[rows * width + cols]
+
+    def nearby(self, x: float, y: float, radius: float) -> Iterator:
+        # стены, которые могут касаться круга или квадрата с полуразмером radius
+        return self.cells.query(x, y, radius + self.max_half)
+
+    def sweep(self, x0, y0, x1, y1):
+        # raycast() для массивов коротких отрезков: стены берутся из таблицы
+        # вокруг середины отрезка и проверяются все сразу. Доля пути до первой
+        # стены, inf - если отрезок стен не задевает
+        dx = x1 - x0
+        dy = y1 - y0
+        t = np.full(len(x0), np.inf)
+        if not len(x0):
+            return t
+        half = float(np.hypot(dx, dy).max()) / 2
+        walls = self.nearby_many(x0 + dx / 2, y0 + dy / 2, half)
+        near = np.flatnonzero(walls[:, 0] >= 0)
+        walls = walls[near]
+        boxes = self.boxes[walls]
+        entry = segment_boxes(
+            x0[near, None], y0[near, None], dx[near, None], dy[near, None],
+            boxes[..., 0], boxes[..., 1], boxes[..., 2], boxes[..., 3],
+        )
+        entry[walls < 0] = np.inf
+        t[near] = entry.min(axis=1)
+        return t
+
+    def raycast(self, x0: float, y0: float, x1: float, y1: float) -> Optional[float]:
+        # обход тайлов вдоль отрезка по порядку пересечения (Amanatides-Woo);
+        # в занятых тайлах отрезок проверяется по самим стенам, так что
+        # стена не по сетке тайлов задевается точно. Доля пути до стены или None
+        size = self.cell_size
+        col, row = self.tile_of(x0, y0)
+        dx = x1 - x0
+        dy = y1 - y0
+        step_col = 1 if dx > 0 else -1
+        step_row = 1 if dy > 0 else -1
+        if dx:
+            t_col = (self.left + (col + (dx > 0)) * size - x0) / dx
+            dt_col = size / abs(dx)
+        else:
+            t_col = dt_col = math.inf
+        if dy:
+            t_row = (self.bottom + (row + (dy > 0)) * size - y0) / dy
+            dt_row = size / abs(dy)
+        else:
+            t_row = dt_row = math.inf
+        while True:
+            if self.is_solid(col, row):
+                # попадание дальше выхода из тайла найдётся в следующем занятом тайле
+                t = self.wall_entry(col, row, x0, y0, dx, dy)
+                if t is not None and t <= min(t_col, t_row):
+                    return t
+            if t_col < t_row:
+                t = t_col
+                col += step_col
+                t_col += dt_col
+            else:
+                t = t_row
+                row += step_row
+                t_row += dt_row
+            if t > 1:
+                return None
+
+    def wall_entry(self, col: int, row: int, x0: float, y0: float, dx: float, dy: float) -> Optional[float]:
+        # ближайший вход отрезка в стены, задевающие тайл
+        size = self.cell_size
+        center_x = self.left + (col + 0.5) * size
+        center_y = self.bottom + (row + 0.5) * size
+        best = None
+        for wx, wy, hw, hh in self.cells.query(center_x, center_y, size / 2 + self.max_half):
+            t = segment_box(x0, y0, dx, dy, wx, wy, hw, hh)
+            if t is not None and (best is None or t < best):
+                best = t
+        return best
+
+    def move_box(self, x: float, y: float, half: float, dx: float, dy: float):
+        # сдвиг квадрата по осям по очереди с упором в стены,
+        # как в arcade.PhysicsEngineSimple
+        if dx:
+            x += dx
+            for wx, wy, hw, hh in self.nearby(x, y, half):
+                if abs(x - wx) < half + hw and abs(y - wy) < half + hh:
+                    x = min(x, wx - hw - half) if dx > 0 else max(x, wx + hw + half)
+        if dy:
+            y += dy
+            for wx, wy, hw, hh in self.nearby(x, y, half):
+                if abs(x - wx) < half + hw and abs(y - wy) < half + hh:
+                    y = min(y, wy - hh - half) if dy > 0 else max(y, wy + hh + half)
+        return x, y
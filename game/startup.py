@@ -0,0 +1,100 @@
+import builtins
+import sys
+import time
+
+# Хронология холодного старта: от запуска процесса до первого кадра меню.
+# mark(stage) ставит отметку этапа (импорт меню, окно, БД, первый кадр).
+# С ключом --startup ещё подменяется __import__ и для каждого впервые
+# загруженного модуля считается время: полное (с вложенными импортами)
+# и собственное. report() печатает этапы, пакеты и самые дорогие модули.
+# Запуск: python main.py --startup из каталога game.
+
+# сколько строк в списках пакетов и модулей
+TOP_MODULES = 15
+
+# время процесса до этого импорта почти целиком - запуск интерпретатора
+_boot_cpu = time.process_time()
+_origin = time.perf_counter()
+_stages = [("интерпретатор (CPU)", _boot_cpu)]
+_last = _origin
+
+# имя: [полное, собственное] в секундах
+_modules = {}
+_stack = []
+_original_import = None
+
+
+def enabled():
+    return "--startup" in sys.argv
+
+
+def begin():
+    global _original_import
+    if _original_import is None and enabled():
+        _original_import = builtins.__import__
+        builtins.__import__ = _timed_import
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level:
+        package = (globals or {}).get("__package__") or ""
+        base = package.rsplit(".", level - 1)[0] if level > 1 else package
+        full = f"{base}.{name}" if name else base
+    else:
+        full = name
+    if full in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    # вложенные импорты вычитаются из собственного времени родителя
+    _stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        spent = time.perf_counter() - start
+        children = _stack.pop()
+        if _stack:
+            _stack[-1] += spent
+        times = _modules.setdefault(full, [0.0, 0.0])
+        times[0] += spent
+        times[1] += spent - children
+
+
+def mark(stage):
+    global _last
+    now = time.perf_counter()
+    _stages.append((stage, now - _last))
+    _last = now
+
+
+def total():
+    return _boot_cpu + _last - _origin
+
+
+def report():
+    if _original_import is not None:
+        builtins.__import__ = _original_import
+    if not enabled():
+        print(f"Запуск до первого кадра меню: {total() * 1000:.0f} мс")
+        return
+
+    print("Запуск, мс:")
+    elapsed = 0.0
+    for stage, spent in _stages:
+        elapsed += spent
+        print(f"  {stage:<40} {spent * 1000:8.1f} {elapsed * 1000:8.1f}")
+
+    # собственное время модулей, сложенное по пакету верхнего уровня
+    packages = {}
+    for name, (_, own) in _modules.items():
+        top = name.split(".")[0]
+        packages[top] = packages.get(top, 0.0) + own
+    imported = sum(packages.values())
+    print(f"Импорт по пакетам, мс (всего {imported * 1000:.1f}):")
+    for top, own in sorted(packages.items(), key=lambda item: -item[1])[:TOP_MODULES]:
+        print(f"  {top:<40} {own * 1000:8.1f}")
+
+    print("Самые долгие импорты, мс (полное / собственное):")
+    ordered = sorted(_modules.items(), key=lambda item: -item[1][0])
+    for name, (full, own) in ordered[:TOP_MODULES]:
+        print(f"  {name:<40} {full * 1000:8.1f} {own * 1000:8.1f}")
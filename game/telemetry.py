@@ -0,0 +1,77 @@
+import os
+import platform
+import sys
+from bisect import bisect_right
+
+# Сводка производительности матча для таблицы perf_sessions.
+# Во время игры копятся только счётчики: гистограмма времени кадра
+# с фиксированными корзинами и суммы времени симуляции и отрисовки.
+
+# верхние границы корзин в мс, последняя корзина - всё, что дольше
+FRAME_BUCKETS_MS = (4, 8, 12, 17, 20, 25, 33, 50, 100)
+# кадр медленный, если он длиннее двух тиков
+SLOW_FRAME_TICKS = 2
+
+
+def bucket_columns():
+    names = [f"ft_lt_{edge}" for edge in FRAME_BUCKETS_MS]
+    names.append(f"ft_ge_{FRAME_BUCKETS_MS[-1]}")
+    return names
+
+
+def machine_info(ctx=None):
+    info = {
+        "platform": platform.platform(),
+        "python_version": platform.python_version(),
+        "cpu_count": os.cpu_count() or 0,
+        "gl_renderer": "",
+    }
+    if ctx is not None:
+        try:
+            info["gl_renderer"] = f"{ctx.info.VENDOR} {ctx.info.RENDERER}"
+        except Exception:
+            pass
+    arcade = sys.modules.get("arcade")
+    info["arcade_version"] = getattr(arcade, "__version__", "")
+    return info
+
+
+class SessionTelemetry:
+    def __init__(self, tick_rate):
+        self.tick_rate = tick_rate
+        self.edges = [edge / 1000 for edge in FRAME_BUCKETS_MS]
+        self.buckets = [0] * (len(FRAME_BUCKETS_MS) + 1)
+        self.slow_limit = SLOW_FRAME_TICKS / tick_rate
+        self.frames = 0
+        self.slow_frames = 0
+        self.dropped_ticks = 0
+        self.frame_time = 0.0
+        self.sim_time = 0.0
+        self.render_time = 0.0
+
+    def frame(self, delta_time):
+        self.buckets[bisect_right(self.edges, delta_time)] += 1
+        self.frames += 1
+        self.frame_time += delta_time
+        if delta_time > self.slow_limit:
+            self.slow_frames += 1
+
+    def summary(self, sim, ctx=None):
+        # строка для Database.record_perf_session
+        busy = self.sim_time + self.render_time
+        row = dict(zip(bucket_columns(), self.buckets))
+        row.update(
+            tick_rate=self.tick_rate,
+            frames=self.frames,
+            duration=round(self.frame_time, 3),
+            slow_frames=self.slow_frames,
+            dropped_ticks=self.dropped_ticks,
+            peak_enemies=sim.enemies.peak,
+            peak_bullets=sim.bullets.peak,
+            sim_ms=round(self.sim_time * 1000, 1),
+            render_ms=round(self.render_time * 1000, 1),
+            sim_share=round(self.sim_time / busy, 4) if busy else 0.0,
+            render_share=round(self.render_time / busy, 4) if busy else 0.0,
+        )
+        row.update(machine_info(ctx))
+        return row
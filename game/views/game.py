@@ -2,26 +2,98 @@ import arcade
 import random
 import math
 import os
-from data import Bullet, Enemy, PlayerSkin, Weapon
-from typing import List
+import time
+from data import PlayerSkin, Weapon
+import atlas
+import audio
+from mapcache import TILEMAP_DIR, build_sprite_lists, bundle_textures, load_map
+from render.actors import ActorRenderer, bake_textures
+from render.bullets import BulletRenderer
+from render.particles import PARTICLE_CAPACITY, ParticleRenderer, ParticleSystem
+from profiler import FrameProfiler
+from quality import QualityGovernor
+from render.hud import Hud
+from render.profiler_overlay import ProfilerOverlay
+from render.static_layers import StaticLayerCache
+from replay import ReplayRecorder
+from simulation import PLAYER_RADIUS, InputState, Simulation, TICK_RATE, default_map
+from telemetry import SessionTelemetry
 
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 800
 SCREEN_TITLE = "2D Shooter Arena"
 
-ENEMY_SPEED = 2
-BULLET_SPEED = 10
-ENEMY_SPAWN_RATE = 60
+# Симуляция идёт фиксированным шагом независимо от частоты кадров
+MAX_STEPS_PER_FRAME = 5
+# сколько секунд виден след выстрела лучом
+TRACER_TIME = 0.15
 
 
 class GameView(arcade.View):
-    def __init__(self, main_menu_view, user_id = 1):
+    def __init__(self, main_menu_view, user_id = 1, tick_rate = TICK_RATE, deferred = False):
         super().__init__()
         self.main_menu_view = main_menu_view
         self.user_id = user_id
+        self.tick_rate = tick_rate
         self.db = main_menu_view.database
-        self.user_data = self.db.get_user_data(user_id) or {}
-        self.user_stats = self.db.get_user_stats_summary(user_id) or {}
+
+        self.map_bundle = None
+        self.map_textures = None
+        self.scene = None
+        self.wall_list = None
+        self.spawn_list = None
+        self.decoration_list = None
+        self.background_list = None
+        self.map_data = None
+        self.shot_sound = None
+        self.actor_textures = {}
+
+        self.game_over = False
+        self.keys_pressed = set()
+        self.mouse_x = 0
+        self.mouse_y = 0
+        self.fire_pressed = False
+
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        # следы выстрелов лучом: [x0, y0, x1, y1, осталось секунд]
+        self.tracers = []
+        
+        # весь матч определяется сидом и вводом по тикам, поэтому его можно повторить
+        self.seed = random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+
+        # deferred: загрузку по частям ведёт LoadingView,
+        # иначе всё грузится сразу, как раньше
+        if not deferred:
+            self.prepare()
+            for _, step in self.setup_steps():
+                step()
+
+    def prepare(self, report=print):
+        # всё, что не трогает OpenGL: LoadingView вызывает это в фоновом потоке
+        report("Профиль игрока...")
+        self.load_user()
+        report("Звуки...")
+        self.load_sounds()
+        report("Карта...")
+        self.load_map_data()
+        report("Текстуры...")
+        self.actor_textures = bake_textures(self.player_body_color(), PLAYER_RADIUS)
+
+    def setup_steps(self):
+        # создание GL-ресурсов; в LoadingView - по шагу за кадр в главном потоке
+        return [
+            ("Отрисовка", self.create_renderers),
+            ("Спрайты карты", self.build_map_sprites),
+            ("Симуляция", self.create_simulation),
+            ("Интерфейс", self.create_hud),
+            ("Статичные слои", self.warm_layers),
+        ]
+
+    def load_user(self):
+        self.user_data = self.db.get_user_data(self.user_id) or {}
+        self.user_stats = self.db.get_user_stats_summary(self.user_id) or {}
         skin_name = self.user_data.get('current_skin', 'Солдат')
         skin_level = self.user_data.get('skin_level', 1)
         if skin_name == "Солдат":
@@ -50,87 +122,87 @@ class GameView(arcade.View):
 
         self.weapon.level = weapon_level
 
-        self.tile_map = None
-        self.scene = None
-        self.wall_list = None
-        self.spawn_list = None
-        self.decoration_list = None
-        self.background_list = None
-        self.physics_engine = None
-
-        # Параметры игрока (основанные на скине)
-        self.player_health = self.player_skin.max_health
-        self.player_max_health = self.player_skin.max_health
-        self.player_speed = self.player_skin.speed
-        self.player_x = SCREEN_WIDTH // 2
-        self.player_y = SCREEN_HEIGHT // 2
-        self.player_radius = 25
-        
-        self.player_sprite = None
-        self.bullets: List[Bullet] = []
-        self.enemies: List[Enemy] = []
-        self.enemy_spawn_timer = 0
-        self.score = 0
-        self.total_kills = 0
-        self.game_time = 0
-        self.game_over = False
-        self.keys_pressed = set()
-        self.mouse_x = 0
-        self.mouse_y = 0
-        self.shoot_cooldown = 0
-        
-        self.load_sounds()
-        self.load_tmx_map()
-        self.setup_player()
+    def create_renderers(self):
+        self.actor_renderer = ActorRenderer(self.actor_textures)
+        self.bullet_renderer = BulletRenderer(self.window.ctx)
+        self.particle_renderer = ParticleRenderer(self.window.ctx, PARTICLE_CAPACITY)
+        self.particles = ParticleSystem()
+        self.layer_cache = StaticLayerCache(self.window)
+
+    def create_simulation(self):
+        # вся игровая логика живёт в симуляции, вид только рисует и передаёт ввод
+        self.sim = Simulation(
+            self.player_skin, self.weapon, self.map_data,
+            tick_rate=self.tick_rate, rng=random.Random(self.seed),
+            width=SCREEN_WIDTH, height=SCREEN_HEIGHT,
+        )
+        self.recorder = ReplayRecorder(
+            self.seed, self.tick_rate, self.player_skin, self.weapon, self.map_data,
+            SCREEN_WIDTH, SCREEN_HEIGHT,
+        )
+        # замер фаз кадра, включается вместе с оверлеем по F3
+        self.profiler = FrameProfiler()
+        self.sim.profiler = self.profiler
+        # сводка по кадрам матча, пишется в perf_sessions в end_game
+        self.telemetry = SessionTelemetry(self.tick_rate)
+        # уровень детализации по измеренной стоимости кадра
+        self.quality = QualityGovernor()
+        self.update_cost = 0.0
+        self.apply_quality()
+
+    def create_hud(self):
+        self.hud = Hud(
+            SCREEN_WIDTH, SCREEN_HEIGHT,
+            self.user_data.get('username', 'Игрок'),
+            self.player_skin.level, self.weapon.name,
+        )
+        self.profiler_overlay = ProfilerOverlay(self.profiler, 10, SCREEN_HEIGHT - 60)
+
+    def warm_layers(self):
+        # статичные слои рисуются в текстуры заранее, а не в первом кадре игры
+        self.layer_cache.prepare("ground", self.draw_ground)
+        self.layer_cache.prepare("walls", self.wall_list.draw)
     
-    def load_tmx_map(self):
+    def load_map_data(self):
         try:
-            map_path = "assets/tilemaps/lv1.tmx"
+            map_path = os.path.join(TILEMAP_DIR, "lv1.tmx")
 
             if not os.path.exists(map_path):
                 print(f"Файл карты не найден: {map_path}")
                 print("Создаю карту по умолчанию...")
-                self.create_default_map()
+                self.map_data = default_map(self.rng, SCREEN_WIDTH, SCREEN_HEIGHT)
                 return
 
-            layer_options = {
-                "walls": {
-                    "use_spatial_hash": True,
-                },
-                "spawn": {
-                    "use_spatial_hash": False,
-                },
-                "decorations": {
-                    "use_spatial_hash": False,
-                },
-                "background": {
-                    "use_spatial_hash": False,
-                }
-            }
-
-            self.tile_map = arcade.load_tilemap(
-                map_path, 
-                scaling=1.0,
-                layer_options=layer_options
-            )
-
-            self.scene = arcade.Scene.from_tilemap(self.tile_map)
-            self.wall_list = self.scene.get_sprite_list("walls")
-            self.spawn_list = self.scene.get_sprite_list("spawn")
-            self.decoration_list = self.scene.get_sprite_list("decorations")
-            self.background_list = self.scene.get_sprite_list("background")
-            if self.background_list is None:
-                self.background_list = arcade.SpriteList()
+            # XML разбирается только при первом запуске или после правки файла,
+            # иначе карта берётся из бандла в cache/maps
+            self.map_bundle = load_map(map_path)
+            self.map_data = self.map_bundle.map_data()
+            # страницы атласа открываются здесь же, в фоновом потоке загрузки
+            self.map_textures = bundle_textures(self.map_bundle, atlas.shared())
             
             print(f"TMX карта загружена успешно!")
-            print(f"Размер: {self.tile_map.width}x{self.tile_map.height} тайлов")
-            print(f"Спрайтов стен: {len(self.wall_list) if self.wall_list else 0}")
-            print(f"Точек спавна: {len(self.spawn_list) if self.spawn_list else 0}")
+            print(f"Размер: {self.map_bundle.width}x{self.map_bundle.height} тайлов")
+            print(f"Стен: {len(self.map_data.walls)}")
+            print(f"Точек спавна: {len(self.map_data.spawn_points)}")
             
         except Exception as e:
             print(f"Ошибка загрузки TMX карты: {e}")
             print("Создаю карту по умолчанию...")
+            self.map_bundle = None
+            self.map_data = default_map(self.rng, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+    def build_map_sprites(self):
+        if self.map_bundle is None:
             self.create_default_map()
+            return
+        sprite_lists = build_sprite_lists(self.map_bundle, self.map_textures)
+        self.wall_list = sprite_lists["walls"]
+        self.spawn_list = sprite_lists["spawn"]
+        self.decoration_list = sprite_lists["decorations"]
+        self.background_list = sprite_lists["background"]
+        self.scene = arcade.Scene()
+        for name, sprite_list in sprite_lists.items():
+            self.scene.add_sprite_list(name, sprite_list=sprite_list)
     
     def create_default_map(self):
         print("Создание карты по умолчанию...")
@@ -139,34 +211,17 @@ class GameView(arcade.View):
         self.decoration_list = arcade.SpriteList()
         self.background_list = arcade.SpriteList()
 
-        tile_size = 64
-        map_width = SCREEN_WIDTH // tile_size
-        map_height = SCREEN_HEIGHT // tile_size
-        for x in range(map_width):
-            self.create_wall_sprite(x * tile_size + tile_size//2, tile_size//2, tile_size)
-            self.create_wall_sprite(x * tile_size + tile_size//2, SCREEN_HEIGHT - tile_size//2, tile_size)
-        
-        for y in range(map_height):
-            self.create_wall_sprite(tile_size//2, y * tile_size + tile_size//2, tile_size)
-            self.create_wall_sprite(SCREEN_WIDTH - tile_size//2, y * tile_size + tile_size//2, tile_size)
-
-        for _ in range(10):
-            x = random.randint(2, map_width - 3) * tile_size + tile_size//2
-            y = random.randint(2, map_height - 3) * tile_size + tile_size//2
-            self.create_wall_sprite(x, y, tile_size)
-
-        for i in range(5):
-            self.create_spawn_sprite(random.randint(100, SCREEN_WIDTH-100), SCREEN_HEIGHT-100)
-            self.create_spawn_sprite(random.randint(100, SCREEN_WIDTH-100), 100)
-            self.create_spawn_sprite(100, random.randint(100, SCREEN_HEIGHT-100))
-            self.create_spawn_sprite(SCREEN_WIDTH-100, random.randint(100, SCREEN_HEIGHT-100))
+        for x, y, half_width, _ in self.map_data.walls:
+            self.create_wall_sprite(x, y, int(half_width * 2))
+        for x, y in self.map_data.spawn_points:
+            self.create_spawn_sprite(x, y)
 
         self.scene = arcade.Scene()
         self.scene.add_sprite_list("walls", sprite_list=self.wall_list)
         self.scene.add_sprite_list("spawn", sprite_list=self.spawn_list)
         self.scene.add_sprite_list("decorations", sprite_list=self.decoration_list)
         self.scene.add_sprite_list("background", sprite_list=self.background_list)
-    
+
     def create_wall_sprite(self, x, y, size):
         sprite = arcade.SpriteSolidColor(size, size, arcade.color.BROWN)
         sprite.center_x = x
@@ -179,93 +234,96 @@ class GameView(arcade.View):
         sprite.center_y = y
         self.spawn_list.append(sprite)
     
-    def setup_player(self):
-        self.player_sprite = arcade.SpriteSolidColor(
-            self.player_radius * 2, 
-            self.player_radius * 2, 
-            arcade.color.BLUE
-        )
-        self.player_sprite.center_x = self.player_x
-        self.player_sprite.center_y = self.player_y
-        if self.wall_list:
-            self.physics_engine = arcade.PhysicsEngineSimple(
-                self.player_sprite, 
-                self.wall_list
-            )
-    
     def on_show(self):
         arcade.set_background_color(arcade.color.DARK_GREEN)
         print(f"Игра начата!")
         print(f"Скин: {self.player_skin.name} (Уровень {self.player_skin.level})")
         print(f"Оружие: {self.weapon.name} (Уровень {self.weapon.level})")
-        print(f"Здоровье: {self.player_health}/{self.player_max_health}")
-        print(f"Скорость: {self.player_speed}")
+        print(f"Здоровье: {self.sim.player_health}/{self.sim.player_max_health}")
+        print(f"Скорость: {self.sim.player_speed}")
         print(f"Урон оружия: {self.weapon.damage}")
     
     def on_draw(self):
+        draw_start = time.perf_counter()
+        profiler = self.profiler
+        profiler.start()
         self.clear()
+        # статичные слои берутся из кэша, стены по-прежнему поверх врагов и пуль
+        self.layer_cache.draw("ground", self.draw_ground)
+        profiler.mark("draw_ground")
+        self.draw_enemies()
+        profiler.mark("draw_enemies")
+        self.draw_bullets()
+        profiler.mark("draw_bullets")
+        self.particle_renderer.draw_particles(self.particles)
+        profiler.mark("draw_particles")
+        self.layer_cache.draw("walls", self.wall_list.draw)
+        profiler.mark("draw_walls")
+        self.draw_player()
+        profiler.mark("draw_player")
+        self.draw_ui()
+        if self.game_over:
+            self.draw_game_over()
+        profiler.mark("draw_ui")
+        profiler.end_frame()
+        self.profiler_overlay.draw(
+            len(self.sim.enemies), len(self.sim.bullets), self.particles.live, self.quality
+        )
+        render_cost = time.perf_counter() - draw_start
+        self.telemetry.render_time += render_cost
+        if self.quality.frame(self.update_cost + render_cost):
+            self.apply_quality()
+        self.update_cost = 0.0
+
+    def apply_quality(self):
+        # остальное (детализация врагов, полоски, HUD) читается из уровня при отрисовке
+        self.particles.frame_budget = self.quality.level.particle_budget
+    
+    def draw_ground(self):
         arcade.draw_lbwh_rectangle_filled(
             0, 0, SCREEN_WIDTH, SCREEN_HEIGHT,
             arcade.color.DARK_GRAY
         )
-
         self.background_list.draw()
         self.decoration_list.draw()
-        for enemy in self.enemies:
-            enemy.draw()
-        for bullet in self.bullets:
-            bullet.draw()
-        self.wall_list.draw()
-        self.draw_player()
-        self.draw_ui()
-        if self.game_over:
-            self.draw_game_over()
-    
-    def draw_player(self):
+
+    def on_resize(self, width, height):
+        self.layer_cache.invalidate()
+
+    def draw_enemies(self):
+        # отрисовка между двумя последними тиками
+        enemies = self.sim.enemies
+        enemy_x, enemy_y = enemies.interpolate(self.alpha)
+        level = self.quality.level
+        self.actor_renderer.draw_enemies(
+            enemies, enemy_x, enemy_y, level.enemy_detail, level.health_bars
+        )
+
+    def draw_bullets(self):
+        bullets = self.sim.bullets
+        bullet_x, bullet_y = bullets.interpolate(self.alpha)
+        self.bullet_renderer.draw_bullets(bullets, bullet_x, bullet_y)
+        for x0, y0, x1, y1, left in self.tracers:
+            alpha = int(255 * left / TRACER_TIME)
+            arcade.draw_line(x0, y0, x1, y1, (255, 255, 200, alpha), 2)
+
+    def player_body_color(self):
         if self.player_skin.name == "Солдат":
-            body_color = arcade.color.ARMY_GREEN
+            return arcade.color.ARMY_GREEN
         elif self.player_skin.name == "Бандит":
-            body_color = arcade.color.DARK_RED
+            return arcade.color.DARK_RED
         else:
-            body_color = arcade.color.DARK_BLUE
+            return arcade.color.DARK_BLUE
 
-        arcade.draw_circle_filled(
-            self.player_x, self.player_y,
-            self.player_radius, body_color
-        )
-        arcade.draw_circle_outline(
-            self.player_x, self.player_y,
-            self.player_radius, arcade.color.BLACK, 3
-        )
-        dx = self.mouse_x - self.player_x
-        dy = self.mouse_y - self.player_y
-        angle = math.atan2(dy, dx)
-        eye_x = self.player_x + math.cos(angle) * 15
-        eye_y = self.player_y + math.sin(angle) * 15
-        arcade.draw_circle_filled(eye_x, eye_y, 8, arcade.color.WHITE)
-        arcade.draw_circle_filled(eye_x, eye_y, 4, arcade.color.BLACK)
-        weapon_length = 30
-        weapon_end_x = self.player_x + math.cos(angle) * weapon_length
-        weapon_end_y = self.player_y + math.sin(angle) * weapon_length
-        
-        arcade.draw_line(
-            self.player_x, self.player_y,
-            weapon_end_x, weapon_end_y,
-            arcade.color.BLACK, 4
-        )
-        health_width = 60
-        health_ratio = self.player_health / self.player_max_health
-        arcade.draw_lbwh_rectangle_filled(
-            self.player_x - health_width/2, 
-            self.player_y + self.player_radius + 25,
-            health_width, 8, 
-            arcade.color.DARK_GRAY
-        )
-        arcade.draw_lbwh_rectangle_filled(
-            self.player_x - health_width/2,
-            self.player_y + self.player_radius + 25,
-            health_width * health_ratio, 6,
-            arcade.color.GREEN if health_ratio > 0.3 else arcade.color.RED
+    def draw_player(self):
+        body_color = self.player_body_color()
+        sim = self.sim
+        player_x = sim.prev_player_x + (sim.player_x - sim.prev_player_x) * self.alpha
+        player_y = sim.prev_player_y + (sim.player_y - sim.prev_player_y) * self.alpha
+        angle = math.atan2(self.mouse_y - player_y, self.mouse_x - player_x)
+        self.actor_renderer.draw_player(
+            player_x, player_y, angle, sim.player_radius,
+            body_color, sim.player_health / sim.player_max_health,
         )
     
     def draw_ui(self):
@@ -273,50 +331,20 @@ class GameView(arcade.View):
             0, 0, SCREEN_WIDTH, 80,
             arcade.color.DARK_SLATE_GRAY
         )
-        arcade.draw_text(
-            f"👤 {self.user_data.get('username', 'Игрок')}",
-            20, SCREEN_HEIGHT - 40,
-            arcade.color.WHITE, 22,
-            font_name="arial", bold=True
-        )
-        
-        arcade.draw_text(
-            f"Уровень {self.player_skin.level}",
-            20, SCREEN_HEIGHT - 40,
-            arcade.color.RED, 18,
-            font_name="arial"
-        )
-
-        stats = [
-            f"{self.player_health}/{self.player_max_health}",
-            f"Счёт: {self.score}",
-            f"Время: {int(self.game_time)}с",
-            f"Убито: {self.total_kills}",
-            f"{self.weapon.name}"
-        ]
-        
-        for i, stat in enumerate(stats):
-            arcade.draw_text(
-                stat,
-                SCREEN_WIDTH // 2 - 300 + i * 150, 
-                SCREEN_HEIGHT - 40,
-                arcade.color.RED, 20,
-                font_name="arial"
+        sim = self.sim
+        if self.quality.frames % self.quality.level.hud_interval == 0:
+            self.hud.update(
+                sim.player_health, sim.player_max_health,
+                sim.score, sim.game_time, sim.total_kills,
             )
-
-        # Для одарённых
-        arcade.draw_text(
-            "WASD - движение | ЛКМ - стрельба | ESC - выход",
-            SCREEN_WIDTH // 2, 30,
-            arcade.color.LIGHT_GRAY, 18,
-            anchor_x="center", font_name="arial"
-        )
+        self.hud.draw()
     
     def load_sounds(self):
         try:
             shot_sound_path = "../assets/sounds/shot.mp3"
             if os.path.exists(shot_sound_path):
-                self.shot_sound = arcade.load_sound(shot_sound_path)
+                # клип декодируется один раз на процесс, плееры общие для всех матчей
+                self.shot_sound = audio.pool(shot_sound_path)
                 print(f"Звук выстрела загружен: {shot_sound_path}")
             else:
                 print(f"Файл звука выстрела не найден: {shot_sound_path}")
@@ -356,190 +384,81 @@ class GameView(arcade.View):
             640, 300,
             arcade.color.GOLD, 4
         )
-        
-        arcade.draw_text(
-            "Game Over((",  # простите, шрифта не нашлось
-            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 90,
-            arcade.color.RED, 48,
-            anchor_x="center", bold=True
-        )
-        
-        arcade.draw_text(
-            f"Ваш счёт: {self.score}",
-            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 30,
-            arcade.color.WHITE, 32,
-            anchor_x="center"
-        )
-        
-        arcade.draw_text(
-            f"Убито врагов: {self.total_kills}",
-            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20,
-            arcade.color.WHITE, 24,
-            anchor_x="center"
-        )
-        
-        arcade.draw_text(
-            "Нажмите ESC для выхода в меню",
-            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 80,
-            arcade.color.YELLOW, 20,
-            anchor_x="center"
-        )
+        self.hud.draw_game_over(self.sim.score, self.sim.total_kills)
     
     def on_update(self, delta_time):
         if self.game_over:
             return
-        
-        self.game_time += delta_time
-        if self.shoot_cooldown > 0:
-            self.shoot_cooldown -= 1
-        self.handle_player_movement()
-        if self.physics_engine:
-            self.physics_engine.update()
-            self.player_x = self.player_sprite.center_x
-            self.player_y = self.player_sprite.center_y
-        self.update_bullets()
-        self.update_enemies()
-        self.spawn_enemies()
-        self.check_collisions()
-        if self.player_health <= 0:
-            self.end_game()
-    
-    def handle_player_movement(self):
-        dx, dy = 0, 0
-        if arcade.key.W in self.keys_pressed:
-            dy += self.player_speed
-        if arcade.key.S in self.keys_pressed:
-            dy -= self.player_speed
-        if arcade.key.A in self.keys_pressed:
-            dx -= self.player_speed
-        if arcade.key.D in self.keys_pressed:
-            dx += self.player_speed
-
-        if dx != 0 and dy != 0:
-            dx *= 0.7071
-            dy *= 0.7071
-        if self.player_sprite:
-            self.player_sprite.change_x = dx
-            self.player_sprite.change_y = dy
-        if not self.physics_engine:
-            self.player_x += dx
-            self.player_y += dy
-            self.player_x = max(self.player_radius, min(SCREEN_WIDTH - self.player_radius, self.player_x))
-            self.player_y = max(self.player_radius, min(SCREEN_HEIGHT - self.player_radius, self.player_y))
-    
-    def update_bullets(self):
-        bullets_to_remove = []
-        
-        for i, bullet in enumerate(self.bullets):
-            bullet.update()
-            if (bullet.x < 0 or bullet.x > SCREEN_WIDTH or 
-                bullet.y < 0 or bullet.y > SCREEN_HEIGHT):
-                bullets_to_remove.append(i)
-            if self.wall_list:
-                for wall in self.wall_list:
-                    distance = math.sqrt(
-                        (bullet.x - wall.center_x)**2 + 
-                        (bullet.y - wall.center_y)**2
-                    )
-                    if distance < bullet.radius + wall.width / 2:
-                        bullets_to_remove.append(i)
-                        break
-        for i in reversed(bullets_to_remove):
-            if i < len(self.bullets):
-                self.bullets.pop(i)
-    
-    def update_enemies(self):
-        for enemy in self.enemies:
-            enemy.update(self.player_x, self.player_y)
-            if self.wall_list:
-                for wall in self.wall_list:
-                    distance = math.sqrt(
-                        (enemy.x - wall.center_x)**2 + 
-                        (enemy.y - wall.center_y)**2
-                    )
-                    if distance < enemy.radius + wall.width / 2:
-                        dx = enemy.x - wall.center_x
-                        dy = enemy.y - wall.center_y
-                        dist = max(0.1, distance)
-                        enemy.x += (dx / dist) * 5
-                        enemy.y += (dy / dist) * 5
-    
-    def spawn_enemies(self):
-        self.enemy_spawn_timer += 1
-        if self.enemy_spawn_timer >= ENEMY_SPAWN_RATE and self.spawn_list:
-            self.enemy_spawn_timer = 0
-            spawn_point = random.choice(self.spawn_list)
-            enemy = Enemy(
-                x=spawn_point.center_x,
-                y=spawn_point.center_y,
-                health=30 + int(self.game_time) // 10,
-                max_health=30 + int(self.game_time) // 10,
-                speed=ENEMY_SPEED + random.uniform(-0.5, 0.5),
-                radius=20 + random.randint(-5, 5)
-            )
-            
-            self.enemies.append(enemy)
-    
-    def check_collisions(self):
-        bullets_to_remove = []
-        enemies_to_remove = []
-        for i, bullet in enumerate(self.bullets):
-            for j, enemy in enumerate(self.enemies):
-                distance = math.sqrt(
-                    (bullet.x - enemy.x)**2 + (bullet.y - enemy.y)**2
-                )
-                
-                if distance < bullet.radius + enemy.radius:
-                    enemy.health -= self.weapon.damage
-                    bullets_to_remove.append(i)
-                    
-                    if enemy.health <= 0:
-                        enemies_to_remove.append(j)
-                        self.score += 10
-                        self.total_kills += 1
-                    break
-
-        for i in reversed(enemies_to_remove):
-            self.enemies.pop(i)
-        
-        for i in reversed(bullets_to_remove):
-            if i < len(self.bullets):
-                self.bullets.pop(i)
 
-        for enemy in self.enemies:
-            distance = math.sqrt(
-                (self.player_x - enemy.x)**2 + (self.player_y - enemy.y)**2
-            )
-            
-            if distance < self.player_radius + enemy.radius:
-                self.player_health -= 5
-                dx = enemy.x - self.player_x
-                dy = enemy.y - self.player_y
-                dist = max(0.1, distance)
-                enemy.x += (dx / dist) * 20
-                enemy.y += (dy / dist) * 20
-    
-    def shoot(self):
-        if self.shoot_cooldown > 0:
-            return
+        # фиксированный шаг: при медленных кадрах делается несколько тиков,
+        # но не больше MAX_STEPS_PER_FRAME, остаток отбрасывается
+        sim = self.sim
+        update_start = time.perf_counter()
+        self.telemetry.frame(delta_time)
+        self.accumulator += delta_time
+        steps = 0
+        # допуск на накопленную ошибку округления delta_time
+        while self.accumulator >= sim.tick_dt - 1e-9 and steps < MAX_STEPS_PER_FRAME:
+            self.accumulator -= sim.tick_dt
+            steps += 1
+            inp = self.read_input()
+            self.recorder.record(inp)
+            sim.step(inp)
+            self.recorder.check(sim)
+            self.handle_events()
+            self.profiler.mark("events")
+            if sim.game_over:
+                self.end_game()
+                break
+        if self.accumulator >= sim.tick_dt:
+            self.telemetry.dropped_ticks += int(self.accumulator // sim.tick_dt)
+            self.accumulator %= sim.tick_dt
+        self.update_cost = time.perf_counter() - update_start
+        self.telemetry.sim_time += self.update_cost
+        self.alpha = max(0.0, self.accumulator) / sim.tick_dt
+        self.particles.update(delta_time)
+        if self.tracers:
+            for tracer in self.tracers:
+                tracer[4] -= delta_time
+            self.tracers = [tracer for tracer in self.tracers if tracer[4] > 0]
 
-        self.shoot_cooldown = int(self.weapon.fire_rate * 60)
-        dx = self.mouse_x - self.player_x
-        dy = self.mouse_y - self.player_y
-        dist = max(0.1, math.sqrt(dx*dx + dy*dy))
-        bullet = Bullet(
-            x=self.player_x,
-            y=self.player_y,
-            dx=(dx / dist) * BULLET_SPEED,
-            dy=(dy / dist) * BULLET_SPEED,
-            damage=self.weapon.damage
+    def read_input(self):
+        inp = InputState(
+            up=arcade.key.W in self.keys_pressed,
+            down=arcade.key.S in self.keys_pressed,
+            left=arcade.key.A in self.keys_pressed,
+            right=arcade.key.D in self.keys_pressed,
+            aim_x=self.mouse_x,
+            aim_y=self.mouse_y,
+            fire=self.fire_pressed,
         )
-        self.play_shot_sound()
-        self.bullets.append(bullet)
+        # выстрел по щелчку, а не пока кнопка зажата
+        self.fire_pressed = False
+        return inp
+
+    def handle_events(self):
+        shot_x, shot_y = self.sim.player_x, self.sim.player_y
+        for kind, x, y in self.sim.events:
+            if kind == "shot":
+                self.play_shot_sound()
+                shot_x, shot_y = x, y
+                # вспышка у ствола, конусом в сторону прицела
+                angle = math.atan2(self.mouse_y - y, self.mouse_x - x)
+                self.particles.emit(
+                    "shot", x + math.cos(angle) * PLAYER_RADIUS, y + math.sin(angle) * PLAYER_RADIUS,
+                    angle, spread=0.4,
+                )
+            elif kind == "hit":
+                self.particles.emit("hit", x, y)
+            elif kind == "kill":
+                self.particles.emit("kill", x, y)
+            elif kind == "ray":
+                self.tracers.append([shot_x, shot_y, x, y, TRACER_TIME])
     
     def end_game(self):
         self.game_over = True
-        money_earned = self.score // 10
+        self.sim.game_over = True
+        money_earned = self.sim.score // 10
         money_earned = max(10, money_earned)
         current_money = self.user_stats.get('money', 1000)
         new_money = current_money + money_earned
@@ -550,14 +469,23 @@ class GameView(arcade.View):
         self.db.cursor.execute('''
             INSERT INTO game_records (user_id, score, kills, play_time)
             VALUES (?, ?, ?, ?)
-        ''', (self.user_id, self.score, self.total_kills, int(self.game_time)))
+        ''', (self.user_id, self.sim.score, self.sim.total_kills, int(self.sim.game_time)))
         self.db.conn.commit()
+        self.db.record_perf_session(
+            self.user_id, self.telemetry.summary(self.sim, self.window.ctx)
+        )
         
         print(f"Игра завершена!")
-        print(f"Счёт: {self.score}")
-        print(f"Убито врагов: {self.total_kills}")
+        print(f"Счёт: {self.sim.score}")
+        print(f"Убито врагов: {self.sim.total_kills}")
         print(f"Заработано денег: {money_earned}")
-        print(f"Общее время: {int(self.game_time)} секунд")
+        print(f"Общее время: {int(self.sim.game_time)} секунд")
+        print(f"Пул пуль: {self.sim.bullets.stats()}")
+        print(f"Пул врагов: {self.sim.enemies.stats()}")
+        try:
+            print(f"Повтор сохранён: {self.recorder.save()}")
+        except OSError as e:
+            print(f"Не удалось сохранить повтор: {e}")
     
     def on_key_press(self, key, modifiers):
         self.keys_pressed.add(key)
@@ -568,14 +496,22 @@ class GameView(arcade.View):
             else:
                 print("Нажмите ESC еще раз для выхода в меню")
 
+        if key in (arcade.key.SPACE, arcade.key.P, arcade.key.H) and not self.game_over:
+            # читы меняют симуляцию мимо ввода, повтор уже не сойдётся
+            self.recorder.tainted = True
         if key == arcade.key.SPACE:
-            self.spawn_enemies()
+            self.sim.spawn_enemies()
         if key == arcade.key.P:
-            self.score += 100
+            self.sim.score += 100
         if key == arcade.key.H:
-            self.player_health = min(self.player_max_health, self.player_health + 50)
+            self.sim.player_health = min(self.sim.player_max_health, self.sim.player_health + 50)
         if key == arcade.key.G:
             self.end_game()
+        if key == arcade.key.F3:
+            self.profiler_overlay.toggle()
+        if key == arcade.key.F4:
+            self.quality.cycle()
+            self.apply_quality()
     
     def on_key_release(self, key, modifiers):
         if key in self.keys_pressed:
@@ -587,4 +523,4 @@ class GameView(arcade.View):
     
     def on_mouse_press(self, x, y, button, modifiers):
         if button == arcade.MOUSE_BUTTON_LEFT and not self.game_over:
-            self.shoot()
+            self.fire_pressed = True
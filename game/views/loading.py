@@ -0,0 +1,109 @@
+import threading
+
+import arcade
+
+import fonts
+
+# Экран загрузки матча: всё без OpenGL (модули игры, БД, звуки, карта,
+# текстуры в PIL) грузится в фоновом потоке, а GL-ресурсы создаются
+# в главном потоке по одному шагу за кадр, так что окно не замирает.
+
+SCREEN_WIDTH = 1200
+SCREEN_HEIGHT = 800
+BAR_WIDTH = 500
+BAR_HEIGHT = 24
+# доля полосы загрузки на фоновый поток, остальное - на шаги в главном потоке
+WORKER_SHARE = 0.5
+# отчёты фонового потока: импорт игры и четыре у GameView.prepare
+WORKER_REPORTS = 5
+
+
+class LoadingView(arcade.View):
+    def __init__(self, main_menu_view, user_id = 1):
+        super().__init__()
+        self.main_menu_view = main_menu_view
+        self.user_id = user_id
+        # вид игры создаётся в фоновом потоке вместе с импортом его модулей
+        self.game_view = None
+        self.steps = []
+        self.done_steps = 0
+        self.stage = "Подготовка..."
+        self.reports = 0
+        self.error = None
+        self.ready = threading.Event()
+        self.worker = threading.Thread(target=self.work, daemon=True)
+
+        self.title = arcade.Text(
+            "Загрузка матча",
+            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 60,
+            arcade.color.GOLD, 32,
+            anchor_x="center", font_name="Arial", bold=True
+        )
+        self.status = arcade.Text(
+            "",
+            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50,
+            arcade.color.WHITE_SMOKE, 18,
+            anchor_x="center", font_name="Arial"
+        )
+
+    def on_show_view(self):
+        arcade.set_background_color(arcade.color.DARK_SLATE_GRAY)
+        if not self.worker.is_alive() and not self.ready.is_set():
+            self.worker.start()
+
+    def work(self):
+        try:
+            self.report("Модули игры...")
+            from views.game import GameView
+
+            game_view = GameView(self.main_menu_view, self.user_id, deferred=True)
+            game_view.prepare(self.report)
+            self.steps = game_view.setup_steps()
+            self.game_view = game_view
+        except Exception as e:
+            self.error = e
+        self.ready.set()
+
+    def report(self, stage):
+        self.stage = stage
+        self.reports += 1
+
+    def progress(self):
+        worker = 1.0 if self.ready.is_set() else min(self.reports / WORKER_REPORTS, 1.0)
+        steps = self.done_steps / max(1, len(self.steps))
+        return WORKER_SHARE * worker + (1 - WORKER_SHARE) * steps
+
+    def on_update(self, delta_time):
+        if not self.ready.is_set() or self.error is not None:
+            # главный поток пока свободен: доращиваем глифы
+            fonts.warm()
+            return
+        if self.done_steps < len(self.steps):
+            # один шаг с GL за кадр, чтобы экран загрузки успевал обновляться
+            label, step = self.steps[self.done_steps]
+            self.stage = label + "..."
+            step()
+            self.done_steps += 1
+            return
+        self.window.show_view(self.game_view)
+
+    def on_draw(self):
+        self.clear()
+        left = SCREEN_WIDTH // 2 - BAR_WIDTH // 2
+        bottom = SCREEN_HEIGHT // 2 - BAR_HEIGHT // 2
+        arcade.draw_lbwh_rectangle_filled(left, bottom, BAR_WIDTH, BAR_HEIGHT, arcade.color.DARK_BLUE_GRAY)
+        arcade.draw_lbwh_rectangle_filled(
+            left, bottom, BAR_WIDTH * self.progress(), BAR_HEIGHT, arcade.color.GOLDEN_YELLOW
+        )
+        arcade.draw_lbwh_rectangle_outline(left, bottom, BAR_WIDTH, BAR_HEIGHT, arcade.color.WHITE_SMOKE, 2)
+
+        if self.error is not None:
+            self.status.text = f"Ошибка загрузки: {self.error}. ESC - в меню"
+        else:
+            self.status.text = self.stage
+        self.title.draw()
+        self.status.draw()
+
+    def on_key_press(self, key, modifiers):
+        if key == arcade.key.ESCAPE and self.error is not None:
+            self.window.show_view(self.main_menu_view)
@@ -1,12 +1,10 @@
 import arcade
 
-from database import Database
-from views.weapon import WeaponSelectView
-from views.player import PlayerSelectView
-from views.game import GameView
-from views.profile import ProfileView
+import fonts
+import startup
 
-from data import PlayerSkin
+# Виды и данные импортируются при первом переходе к ним: до первого
+# кадра меню грузится только arcade, остальное - по мере надобности.
 
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 800
@@ -24,6 +22,7 @@ class MainMenuView(arcade.View):
         self.database = database
         self.current_user = 1
         self.buttons = []
+        self.first_frame = True
         self.init_ui()
 
     def init_ui(self):
@@ -103,6 +102,15 @@ class MainMenuView(arcade.View):
                 bold=True,
             )
 
+        if self.first_frame:
+            self.first_frame = False
+            startup.mark("первый кадр меню")
+            startup.report()
+
+    def on_update(self, delta_time):
+        # пока меню простаивает, растеризуем глифы остальных видов
+        fonts.warm()
+
     def on_mouse_press(self, x, y, button, modifiers):
         if button == arcade.MOUSE_BUTTON_LEFT:
             for btn_x, btn_y, width, height, text, action in self.buttons:
@@ -125,6 +133,9 @@ class MainMenuView(arcade.View):
             self.show_profile()
 
     def start_game(self):
+        from data import PlayerSkin
+        from views.loading import LoadingView
+
         user_data = self.database.get_user_data(self.current_user) or {}
         current_skin = user_data.get('current_skin', 'Солдат')
 
@@ -138,18 +149,24 @@ class MainMenuView(arcade.View):
         from data import Weapon
         weapon = Weapon("Пистолет", damage=10, fire_rate=0.5)
 
-        game_view = GameView(self, self.current_user)
-        self.window.show_view(game_view)
+        loading_view = LoadingView(self, self.current_user)
+        self.window.show_view(loading_view)
 
     def show_profile(self):
+        from views.profile import ProfileView
+
         profile_view = ProfileView(self)
         self.window.show_view(profile_view)
 
     def switch_to_weapon(self):
+        from views.weapon import WeaponSelectView
+
         weapon_view = WeaponSelectView(self)
         self.window.show_view(weapon_view)
 
     def switch_to_player(self):
+        from views.player import PlayerSelectView
+
         player_view = PlayerSelectView(self, self.current_user)
         self.window.show_view(player_view)
 
@@ -159,11 +176,18 @@ class MainMenuView(arcade.View):
 
 def main():
     window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    startup.mark("окно")
+    from database import Database
+
     db = Database()
     db.create_user("Player1")
+    startup.mark("БД")
+    fonts.start()
+    startup.mark("шрифты")
 
     menu_view = MainMenuView(db)
     window.show_view(menu_view)
+    startup.mark("вид меню")
 
     arcade.run()
     db.close()